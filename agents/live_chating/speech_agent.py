@@ -12,16 +12,20 @@ environment-driven so you can plug in custom endpoints, models, or voices.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
+import mmap
 import os
+import random
+import re
 import signal
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from contextlib import suppress
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, AsyncGenerator, Deque, Dict, Iterable, List, Optional
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional
 
 from dotenv import load_dotenv
 
@@ -29,12 +33,129 @@ from dotenv import load_dotenv
 load_dotenv()
 
 try:
-    import requests
+    import httpx
 except ImportError as exc:  # pragma: no cover - hard failure if dependency missing
     raise SystemExit(
-        "The 'requests' package is required. Install it with `pip install requests`."
+        "The 'httpx' package is required. Install it with `pip install httpx`."
     ) from exc
 
+try:
+    from watchfiles import awatch
+except ImportError:  # pragma: no cover - optional dependency, polling fallback
+    awatch = None
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency, substring fallback
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency, stdlib fallback
+    orjson = None
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency, heuristic fallback
+    tiktoken = None
+
+# Rust-backed parse on the hot transcript/dataset paths when available;
+# both accept bytes, and both raise ValueError subclasses on bad input.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+if orjson is not None:
+    _json_dumps = orjson.dumps
+else:
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+def _token_counter(model: str) -> Any:
+    """Return a callable estimating prompt tokens for ``model``.
+
+    Uses tiktoken when installed; otherwise falls back to the ~4 characters
+    per token rule of thumb, which is plenty accurate for budget eviction.
+    """
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    return lambda text: len(text) // 4 + 1
+
+
+class _RateLimiter:
+    """Sliding-window async limiter: at most ``rate`` calls per ``period`` seconds."""
+
+    def __init__(self, rate: int, period: float = 60.0) -> None:
+        self.rate = rate
+        self.period = period
+        self._stamps: Deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            while self._stamps and now - self._stamps[0] > self.period:
+                self._stamps.popleft()
+            if len(self._stamps) >= self.rate:
+                await asyncio.sleep(self.period - (now - self._stamps[0]))
+            self._stamps.append(time.monotonic())
+
+
+async def _post_with_retry(
+    client: "httpx.AsyncClient",
+    url: str,
+    *,
+    headers: Dict[str, str],
+    json_payload: Any,
+    attempts: int = 4,
+    what: str = "HTTP",
+) -> "httpx.Response":
+    """POST with exponential backoff on 429/5xx, honouring Retry-After.
+
+    The payload is serialized once up front (orjson when available) and sent
+    as raw ``content`` so retries and httpx both skip re-encoding it.
+    Raises the final httpx error when all attempts are exhausted.
+    """
+    body = _json_dumps(json_payload)
+    delay = 1.0
+    for attempt in range(1, attempts + 1):
+        try:
+            response = await client.post(url, headers=headers, content=body)
+        except httpx.TransportError as exc:
+            if attempt == attempts:
+                raise
+            wait = delay + random.uniform(0, delay / 4)
+            logging.warning("%s transport error (%s); retrying in %.1fs", what, exc, wait)
+            await asyncio.sleep(wait)
+            delay *= 2
+            continue
+
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == attempts:
+                response.raise_for_status()
+                return response
+            retry_after = response.headers.get("retry-after")
+            try:
+                wait = float(retry_after) if retry_after else delay
+            except ValueError:
+                wait = delay
+            wait = min(wait, 30.0) + random.uniform(0, delay / 4)
+            logging.warning("%s returned %s; retrying in %.1fs", what, response.status_code, wait)
+            await asyncio.sleep(wait)
+            delay *= 2
+            continue
+
+        response.raise_for_status()
+        return response
+
+    raise RuntimeError("unreachable")  # pragma: no cover
+
 
 # Default ElevenLabs voice/model presets for quick smoke testing.
 DEFAULT_ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel
@@ -68,20 +189,51 @@ Do not encapsulate the searching command in quotes "" or code blocks ``` ```.
 Never respond conversationally (“I’m not sure”, “let me check”) before a search.
 If you fail to use `searching {...}` when required, your output is invalid and will be discarded.
 """
+
+# Tool schema used when the provider supports OpenAI-style function calling.
+# Replaces the DATASET_INSTRUCTION_BLOCK prompt protocol (and its token cost)
+# with a structured tool call parsed by the API instead of string matching.
+DATASET_SEARCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "dataset_search",
+        "description": (
+            "Search the knowledge base for facts about people, projects, or "
+            "other entities mentioned in the conversation."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "label": {"type": "string", "description": "Node label, e.g. Person or Project."},
+                "property": {"type": "string", "description": "Property to match on, e.g. name."},
+                "value": {"type": "string", "description": "Value the property must equal."},
+            },
+            "required": ["label", "property"],
+        },
+    },
+}
+
+# Spoken while a dataset lookup is in flight so the room hears an immediate
+# acknowledgement instead of dead air; synthesized concurrently with the query.
+DATASET_FILLER_PHRASE = "Let me check."
 # --------------------------------------------------------------------------- #
 # Data model and helpers
 # --------------------------------------------------------------------------- #
 
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptSegment:
-    """Represents a single transcript entry emitted by the AWS streaming client."""
+    """Represents a single transcript entry emitted by the AWS streaming client.
+
+    Slotted to keep per-segment allocation small: segments are created for
+    every finalized utterance and retained in each agent's history deque.
+    """
 
     speaker: str
     transcript: str
     start_time: Optional[float] = None
     end_time: Optional[float] = None
-    raw: Dict[str, Any] = field(default_factory=dict)
+    generated: bool = False
 
     @classmethod
     def from_dict(cls, payload: Dict[str, Any]) -> "TranscriptSegment":
@@ -90,7 +242,6 @@ class TranscriptSegment:
             transcript=str(payload.get("transcript", "")).strip(),
             start_time=payload.get("start_time"),
             end_time=payload.get("end_time"),
-            raw=payload,
         )
 
 
@@ -147,6 +298,7 @@ class AgentConfig:
     transcript_path: Path
     poll_interval: float
     history_size: int
+    max_prompt_tokens: int
     response_delay: float
     trigger_phrases: List[str]
 
@@ -154,6 +306,7 @@ class AgentConfig:
     gpt_api_key: str
     gpt_model: str
     gpt_timeout: float
+    gpt_rpm: int
 
     elevenlabs_api_key: Optional[str]
     elevenlabs_voice_id: str
@@ -161,9 +314,12 @@ class AgentConfig:
     elevenlabs_base_url: str
     elevenlabs_audio_format: str
     elevenlabs_output_dir: Path
+    elevenlabs_save_to_disk: bool
     dataset_base_url: Optional[str]
     dataset_timeout: float
     dataset_enabled: bool
+    dataset_use_tools: bool
+    dataset_cache_ttl: float
 
     @property
     def elevenlabs_enabled(self) -> bool:
@@ -186,6 +342,7 @@ class AgentConfig:
         )
         poll_interval = _env_float("TRANSCRIPT_POLL_INTERVAL", 1.0)
         history_size = _env_int("AGENT_HISTORY_SIZE", 24)
+        max_prompt_tokens = _env_int("AGENT_MAX_PROMPT_TOKENS", 2048)
         response_delay = _env_float("AGENT_RESPONSE_DELAY_SECONDS", 1.2)
         trigger_phrases = _split_csv(os.getenv("AGENT_TRIGGER_PHRASES"))
 
@@ -193,6 +350,7 @@ class AgentConfig:
         gpt_api_key = os.getenv("GPT_API_KEY", os.getenv("OPENAI_API_KEY", ""))
         gpt_model = os.getenv("GPT_MODEL", "gpt-5")
         gpt_timeout = _env_float("GPT_REQUEST_TIMEOUT", 45.0)
+        gpt_rpm = _env_int("GPT_RPM", 0)
 
         elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
         elevenlabs_voice_id = os.getenv("ELEVENLABS_VOICE_ID", DEFAULT_ELEVENLABS_VOICE_ID)
@@ -202,19 +360,27 @@ class AgentConfig:
         elevenlabs_output_dir = Path(
             os.getenv("ELEVENLABS_AUDIO_OUTPUT_DIR", "live_chating/audio_responses")
         )
+        # On by default: the Streamlit audio viewer consumes files from the
+        # output directory. Disable when piping synthesize_stream() directly.
+        elevenlabs_save_to_disk = _env_bool("ELEVENLABS_SAVE_TO_DISK", True)
 
         dataset_enabled = _env_bool("DATASET_ENABLE", True)
+        dataset_use_tools = _env_bool("DATASET_USE_TOOLS", True)
         dataset_base_url = os.getenv("DATASET_BASE_URL", "http://localhost:8080")
         if not dataset_enabled:
             dataset_base_url = None
         dataset_timeout = _env_float("DATASET_TIMEOUT", 15.0)
+        dataset_cache_ttl = _env_float("DATASET_CACHE_TTL", 0.0)
 
         if dataset_base_url:
-            system_prompt = (
-                f"{DATASET_INSTRUCTION_BLOCK}\n\n"
-                "Follow the dataset search protocol strictly before answering.\n\n"
-                f"{system_prompt}"
-            )
+            if not dataset_use_tools:
+                # Legacy prompt protocol for providers without tool calling;
+                # with tools enabled the schema replaces this entire block.
+                system_prompt = (
+                    f"{DATASET_INSTRUCTION_BLOCK}\n\n"
+                    "Follow the dataset search protocol strictly before answering.\n\n"
+                    f"{system_prompt}"
+                )
         else:
             dataset_enabled = False
 
@@ -226,21 +392,26 @@ class AgentConfig:
             transcript_path=transcript_path,
             poll_interval=poll_interval,
             history_size=history_size,
+            max_prompt_tokens=max_prompt_tokens,
             response_delay=response_delay,
             trigger_phrases=trigger_phrases,
             gpt_base_url=gpt_base_url.rstrip("/"),
             gpt_api_key=gpt_api_key,
             gpt_model=gpt_model,
             gpt_timeout=gpt_timeout,
+            gpt_rpm=gpt_rpm,
             elevenlabs_api_key=elevenlabs_api_key,
             elevenlabs_voice_id=elevenlabs_voice_id,
             elevenlabs_model_id=elevenlabs_model_id,
             elevenlabs_base_url=elevenlabs_base_url.rstrip("/"),
             elevenlabs_audio_format=elevenlabs_audio_format,
             elevenlabs_output_dir=elevenlabs_output_dir,
+            elevenlabs_save_to_disk=elevenlabs_save_to_disk,
             dataset_base_url=normalized_dataset_base,
             dataset_timeout=dataset_timeout,
             dataset_enabled=dataset_enabled,
+            dataset_use_tools=dataset_use_tools,
+            dataset_cache_ttl=dataset_cache_ttl,
         )
 
 
@@ -250,58 +421,174 @@ class AgentConfig:
 
 
 class TranscriptWatcher:
-    """Polls the JSON transcript dataset for new utterances."""
+    """Watches the transcript dataset for new utterances.
+
+    The watcher understands two on-disk layouts:
+
+    * NDJSON (one JSON object per line): read incrementally by remembering the
+      last byte offset, so each tick only parses the newly appended lines.
+    * Legacy JSON array: re-parsed in full, but only when the file actually
+      changed (gated on ``os.stat`` size/mtime/inode).
+    """
 
     def __init__(self, dataset_path: Path, poll_interval: float = 1.0) -> None:
         self.dataset_path = dataset_path
         self.poll_interval = poll_interval
         self._last_length = 0
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._last_stat: Optional[tuple[int, int]] = None
+        self._partial = b""
+
+    def _reset(self) -> None:
+        self._last_length = 0
+        self._offset = 0
+        self._partial = b""
 
     async def stream(self) -> AsyncGenerator[TranscriptSegment, None]:
         logging.info("Monitoring transcript file: %s", self.dataset_path)
-        while True:
+        if awatch is not None:
             try:
-                raw_text = self.dataset_path.read_text(encoding="utf-8")
-            except FileNotFoundError:
-                logging.debug("Transcript file not found yet. Waiting…")
-                await asyncio.sleep(self.poll_interval)
-                continue
+                async for segment in self._stream_notified():
+                    yield segment
+                return
             except OSError as exc:
-                logging.error("Unable to read transcript file: %s", exc)
-                await asyncio.sleep(self.poll_interval)
-                continue
+                logging.warning("File watching unavailable (%s); falling back to polling.", exc)
 
-            raw_text = raw_text.strip()
-            if not raw_text:
-                await asyncio.sleep(self.poll_interval)
-                continue
-
-            try:
-                payload = json.loads(raw_text)
-            except json.JSONDecodeError:
-                logging.warning("Transcript file contains invalid JSON; retrying shortly.")
-                await asyncio.sleep(self.poll_interval)
-                continue
+        async for segment in self._stream_polling():
+            yield segment
 
-            if not isinstance(payload, list):
-                logging.warning("Transcript dataset is not an array. Ignoring.")
-                await asyncio.sleep(self.poll_interval)
-                continue
+    async def _stream_notified(self) -> AsyncGenerator[TranscriptSegment, None]:
+        """Event-driven variant: the kernel wakes us only on actual writes."""
+        # Wait for the parent directory (awatch needs an existing path).
+        while not self.dataset_path.parent.is_dir():
+            await asyncio.sleep(self.poll_interval)
 
-            if len(payload) < self._last_length:
-                logging.info("Transcript dataset truncated (likely reset). Restarting stream.")
-                self._last_length = 0
+        # Drain whatever is already on disk before subscribing.
+        for segment in self._collect_new():
+            yield segment
 
-            if len(payload) > self._last_length:
-                new_entries = payload[self._last_length :]
-                self._last_length = len(payload)
-                for entry in new_entries:
-                    segment = TranscriptSegment.from_dict(entry)
-                    if segment.transcript:
-                        yield segment
+        # watchfiles reports absolute, canonicalized paths; resolve our
+        # (possibly relative) dataset path so the comparison can ever match.
+        target = str(self.dataset_path.resolve())
+        async for changes in awatch(self.dataset_path.parent):
+            if any(os.path.abspath(path) == target for _, path in changes):
+                for segment in self._collect_new():
+                    yield segment
 
+    async def _stream_polling(self) -> AsyncGenerator[TranscriptSegment, None]:
+        """Sleep-loop fallback when watchfiles is not installed."""
+        while True:
+            for segment in self._collect_new():
+                yield segment
             await asyncio.sleep(self.poll_interval)
 
+    def _collect_new(self) -> List[TranscriptSegment]:
+        try:
+            stat = os.stat(self.dataset_path)
+        except FileNotFoundError:
+            logging.debug("Transcript file not found yet. Waiting…")
+            return []
+        except OSError as exc:
+            logging.error("Unable to stat transcript file: %s", exc)
+            return []
+
+        if stat.st_ino != self._inode:
+            # File was replaced (e.g. atomic rename); start over.
+            self._inode = stat.st_ino
+            self._reset()
+            self._last_stat = None
+
+        if (stat.st_size, stat.st_mtime_ns) == self._last_stat:
+            return []
+        self._last_stat = (stat.st_size, stat.st_mtime_ns)
+
+        if stat.st_size < self._offset:
+            logging.info("Transcript dataset truncated (likely reset). Restarting stream.")
+            self._reset()
+
+        try:
+            with open(self.dataset_path, "rb") as handle:
+                first_byte = handle.read(1)
+                if first_byte == b"[":
+                    entries = self._read_array(handle)
+                else:
+                    entries = self._read_tail(handle)
+        except OSError as exc:
+            logging.error("Unable to read transcript file: %s", exc)
+            return []
+
+        return [
+            segment
+            for segment in map(TranscriptSegment.from_dict, entries)
+            if segment.transcript
+        ]
+
+    def _read_array(self, handle: Any) -> List[Dict[str, Any]]:
+        """Full reparse fallback for the legacy JSON-array layout.
+
+        The file is mmap'd so the parser reads straight from the page cache
+        instead of copying the whole file through an intermediate buffer.
+        """
+        handle.seek(0)
+        try:
+            mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty or unmappable file; nothing to parse.
+            return []
+
+        try:
+            if orjson is not None:
+                view = memoryview(mm)
+                try:
+                    payload = orjson.loads(view)
+                finally:
+                    view.release()
+            else:
+                payload = json.loads(mm[:])
+        except ValueError:
+            logging.warning("Transcript file contains invalid JSON; retrying shortly.")
+            return []
+        finally:
+            mm.close()
+
+        if not isinstance(payload, list):
+            logging.warning("Transcript dataset is not an array. Ignoring.")
+            return []
+
+        if len(payload) < self._last_length:
+            logging.info("Transcript dataset truncated (likely reset). Restarting stream.")
+            self._last_length = 0
+
+        new_entries = payload[self._last_length :]
+        self._last_length = len(payload)
+        return [entry for entry in new_entries if isinstance(entry, dict)]
+
+    def _read_tail(self, handle: Any) -> List[Dict[str, Any]]:
+        """Incrementally parse NDJSON lines appended since the last offset."""
+        handle.seek(self._offset)
+        chunk = self._partial + handle.read()
+        self._offset = handle.tell()
+
+        # The trailing partial line is carried in _partial only; _offset stays
+        # at tell() so the next read never re-fetches those bytes from disk.
+        lines = chunk.split(b"\n")
+        self._partial = lines.pop()
+
+        entries: List[Dict[str, Any]] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = _json_loads(line)
+            except ValueError:
+                logging.warning("Skipping malformed transcript line: %r", line[:120])
+                continue
+            if isinstance(entry, dict):
+                entries.append(entry)
+        return entries
+
 
 # --------------------------------------------------------------------------- #
 # GPT client
@@ -311,22 +598,38 @@ class TranscriptWatcher:
 class GPTClient:
     """Minimal client for GPT-style chat completions."""
 
-    def __init__(self, base_url: str, api_key: str, model: str, timeout: float) -> None:
+    def __init__(self, base_url: str, api_key: str, model: str, timeout: float, rpm: int = 0) -> None:
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.model = model
         self.timeout = timeout
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+        # Optional requests-per-minute cap (GPT_RPM) to avoid stampeding the
+        # provider when several triggers fire close together.
+        self._limiter = _RateLimiter(rpm)
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
 
     @property
     def chat_url(self) -> str:
         return f"{self.base_url}/v1/chat/completions"
 
-    async def chat_completion(
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def chat_message(
         self,
-        messages: List[Dict[str, str]],
+        messages: List[Dict[str, Any]],
         temperature: float = 0.3,
         max_tokens: Optional[int] = None,
-    ) -> Optional[str]:
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the full assistant message (content and/or tool calls)."""
         if not self.api_key:
             logging.error("GPT_API_KEY missing; cannot call the chat endpoint.")
             return None
@@ -338,35 +641,50 @@ class GPTClient:
         }
         if max_tokens:
             payload["max_tokens"] = max_tokens
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = "auto"
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
-        def _request() -> Optional[str]:
-            response = requests.post(
-                self.chat_url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            data = response.json()
-            choices = data.get("choices") or []
-            if not choices:
-                logging.error("GPT response contained no choices.")
-                return None
-            message = choices[0].get("message") or {}
-            content = message.get("content", "")
-            return content.strip()
-
+        await self._limiter.acquire()
         try:
-            return await asyncio.to_thread(_request)
-        except requests.RequestException as exc:
+            response = await _post_with_retry(
+                self._client, self.chat_url, headers=self._headers, json_payload=payload, what="GPT"
+            )
+        except httpx.HTTPError as exc:
             logging.exception("GPT request failed: %s", exc)
             return None
 
+        data = _json_loads(response.content)
+        choices = data.get("choices") or []
+        if not choices:
+            logging.error("GPT response contained no choices.")
+            return None
+        return choices[0].get("message") or {}
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+    ) -> Optional[str]:
+        message = await self.chat_message(messages, temperature=temperature, max_tokens=max_tokens)
+        if message is None:
+            return None
+        content = message.get("content") or ""
+        return content.strip()
+
+    async def batch_chat_completion(
+        self,
+        message_lists: List[List[Dict[str, str]]],
+        temperature: float = 0.3,
+    ) -> List[Optional[str]]:
+        """Run several independent completions concurrently over the pooled client."""
+        return list(
+            await asyncio.gather(
+                *(self.chat_completion(messages, temperature=temperature) for messages in message_lists)
+            )
+        )
+
 
 # --------------------------------------------------------------------------- #
 # ElevenLabs TTS client
@@ -383,19 +701,40 @@ class ElevenLabsTTSClient:
         self.model_id = config.elevenlabs_model_id
         self.audio_format = config.elevenlabs_audio_format
         self.output_dir = config.elevenlabs_output_dir
+        self.save_to_disk = config.elevenlabs_save_to_disk
+
+        self._client = httpx.AsyncClient(
+            timeout=120,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+        self._headers = {
+            "xi-api-key": self.api_key,
+            "Content-Type": "application/json",
+            "Accept": f"audio/{self.audio_format}",
+        }
 
         if config.elevenlabs_enabled:
             self.output_dir.mkdir(parents=True, exist_ok=True)
             logging.info("ElevenLabs audio output directory: %s", self.output_dir)
 
-    async def synthesize(self, text: str) -> Optional[Path]:
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def synthesize_stream(self, text: str) -> AsyncGenerator[bytes, None]:
+        """Yield audio chunks for ``text`` as they stream from ElevenLabs.
+
+        This is the push path: callers can pipe bytes straight into an audio
+        sink with no file handoff in between. Transient failures are retried
+        until the first chunk has been yielded; after that a transport error
+        propagates so the consumer can discard the truncated audio.
+        """
         if not text:
-            return None
+            return
         if not (self.api_key and self.voice_id):
             logging.warning("ElevenLabs credentials or voice ID missing; skipping TTS.")
-            return None
+            return
 
-        url = f"{self.base_url}/v1/text-to-speech/{self.voice_id}"
+        url = f"{self.base_url}/v1/text-to-speech/{self.voice_id}/stream"
         payload: Dict[str, Any] = {
             "text": text,
             "model_id": self.model_id,
@@ -404,37 +743,98 @@ class ElevenLabsTTSClient:
                 "similarity_boost": 0.7,
             },
         }
-        headers = {
-            "xi-api-key": self.api_key,
-            "Content-Type": "application/json",
-            "Accept": f"audio/{self.audio_format}",
-        }
+        body = _json_dumps(payload)
 
-        def _request() -> Optional[Path]:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=120,
-            )
-            response.raise_for_status()
-            content_type = response.headers.get("content-type", "")
-            if "application/json" in content_type.lower():
-                logging.error("ElevenLabs returned error payload: %s", response.text)
-                return None
-
-            filename = f"{int(time.time() * 1000)}.{self.audio_format}"
-            output_path = self.output_dir / filename
-            output_path.write_bytes(response.content)
-            logging.info("Saved ElevenLabs audio to %s", output_path)
-            return output_path
+        delay = 1.0
+        attempts = 4
+        for attempt in range(1, attempts + 1):
+            started = False
+            try:
+                async with self._client.stream("POST", url, headers=self._headers, content=body) as response:
+                    if attempt < attempts and (
+                        response.status_code == 429 or response.status_code >= 500
+                    ):
+                        retry_after = response.headers.get("retry-after")
+                        try:
+                            wait = float(retry_after) if retry_after else delay
+                        except ValueError:
+                            wait = delay
+                        wait = min(wait, 30.0) + random.uniform(0, delay / 4)
+                        logging.warning(
+                            "ElevenLabs returned %s; retrying in %.1fs", response.status_code, wait
+                        )
+                        await asyncio.sleep(wait)
+                        delay *= 2
+                        continue
+
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type", "")
+                    if "application/json" in content_type.lower():
+                        error_body = await response.aread()
+                        logging.error(
+                            "ElevenLabs returned error payload: %s",
+                            error_body.decode("utf-8", "replace"),
+                        )
+                        return
+
+                    async for chunk in response.aiter_bytes(chunk_size=4096):
+                        started = True
+                        yield chunk
+                    return
+            except httpx.TransportError as exc:
+                if started or attempt == attempts:
+                    logging.exception("ElevenLabs TTS call failed: %s", exc)
+                    if started:
+                        raise
+                    return
+                wait = delay + random.uniform(0, delay / 4)
+                logging.warning("ElevenLabs transport error (%s); retrying in %.1fs", exc, wait)
+                await asyncio.sleep(wait)
+                delay *= 2
+            except httpx.HTTPError as exc:
+                logging.exception("ElevenLabs TTS call failed: %s", exc)
+                return
 
+    async def synthesize(self, text: str) -> Optional[Path]:
+        """Collect the audio stream into a content-addressed file on disk.
+
+        The file handoff stays the default because the Streamlit audio viewer
+        polls the output directory; set ELEVENLABS_SAVE_TO_DISK=0 when the
+        caller consumes :meth:`synthesize_stream` directly instead.
+        """
+        if not self.save_to_disk:
+            return None
+
+        # Stream into a hidden temp file while hashing the content, then
+        # atomically rename to a content-addressed name: no timestamp
+        # collisions, and identical syntheses dedupe into one file.
+        temp_path = self.output_dir / f".tts-{os.getpid()}-{id(text):x}.part"
+        digest = hashlib.blake2b(digest_size=16)
+        wrote = False
         try:
-            return await asyncio.to_thread(_request)
-        except requests.RequestException as exc:
-            logging.exception("ElevenLabs TTS call failed: %s", exc)
+            with open(temp_path, "wb") as handle:
+                async for chunk in self.synthesize_stream(text):
+                    digest.update(chunk)
+                    handle.write(chunk)
+                    wrote = True
+        except httpx.HTTPError:
+            temp_path.unlink(missing_ok=True)
             return None
 
+        if not wrote:
+            temp_path.unlink(missing_ok=True)
+            return None
+
+        output_path = self.output_dir / f"{digest.hexdigest()[:16]}.{self.audio_format}"
+        if output_path.exists():
+            temp_path.unlink(missing_ok=True)
+            logging.info("Reusing previously synthesized audio at %s", output_path)
+            return output_path
+
+        os.replace(temp_path, output_path)
+        logging.info("Saved ElevenLabs audio to %s", output_path)
+        return output_path
+
 
 # --------------------------------------------------------------------------- #
 # Dataset client
@@ -448,45 +848,95 @@ class DatasetClient:
         self.base_url = (config.dataset_base_url or "").rstrip("/")
         self.timeout = config.dataset_timeout
         self.enabled = config.dataset_enabled and bool(self.base_url)
+        self._client = httpx.AsyncClient(
+            timeout=config.dataset_timeout,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+        # Opt-in TTL+LRU result cache (DATASET_CACHE_TTL seconds, 0 = off)
+        # so repeated questions in one session skip the HTTP + Neo4j hop.
+        self._cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._cache_ttl = config.dataset_cache_ttl
+        self._cache_max = 256
+        self._headers = {"Content-Type": "application/json"}
         if self.enabled:
             logging.info("Dataset client enabled with base URL: %s", self.base_url)
 
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def bust(self) -> None:
+        """Drop all cached query results (e.g. after a dataset reload)."""
+        self._cache.clear()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        timestamp, value = cached
+        if time.monotonic() - timestamp >= self._cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key: str, value: str) -> None:
+        self._cache[key] = (time.monotonic(), value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_max:
+            self._cache.popitem(last=False)
+
     async def query(self, payload: Dict[str, Any]) -> str:
         if not self.enabled:
             logging.warning("Dataset search attempted but client is disabled.")
             return "Dataset search is disabled."
         url = f"{self.base_url}/query"
-        
+
+        cache_key: Optional[str] = None
+        if self._cache_ttl > 0:
+            cache_key = json.dumps(payload, sort_keys=True)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logging.info("Dataset query served from cache: %s", cache_key)
+                return cached
+
         logging.info("Sending dataset query to %s with payload: %s", url, json.dumps(payload))
 
-        def _request() -> str:
-            response = requests.post(
+        try:
+            response = await _post_with_retry(
+                self._client,
                 url,
-                headers={"Content-Type": "application/json"},
-                json=payload,
-                timeout=self.timeout,
+                headers=self._headers,
+                json_payload=payload,
+                what="Dataset",
             )
-            response.raise_for_status()
-            try:
-                data = response.json()
-                logging.info("Dataset query successful: %s", json.dumps(data, indent=2))
-            except ValueError:
-                logging.info("Dataset query returned non-JSON response: %s", response.text)
-                return response.text
-            return json.dumps(data, indent=2)
-
-        try:
-            return await asyncio.to_thread(_request)
-        except requests.RequestException as exc:
+        except httpx.HTTPError as exc:
             logging.exception("Dataset query failed: %s", exc)
             return f"Dataset query failed: {exc}"
 
+        try:
+            data = _json_loads(response.content)
+            result = json.dumps(data, indent=2)
+            logging.info("Dataset query successful: %s", result)
+        except ValueError:
+            logging.info("Dataset query returned non-JSON response: %s", response.text)
+            result = response.text
+
+        if cache_key is not None:
+            self._cache_put(cache_key, result)
+        return result
+
 
 @dataclass
 class DatasetSearchCommand:
     text: str
     payload: Dict[str, Any]
 
+
+# Locates the "searching" prefix (tolerating a leading code fence) and
+# captures the opening brace of the JSON payload for raw_decode.
+_SEARCH_COMMAND_RE = re.compile(r"(?is)(?:```[a-z]*\s*|`)?searching\s*(\{)")
+_JSON_DECODER = json.JSONDecoder()
+
 # --------------------------------------------------------------------------- #
 # Conversation agent
 # --------------------------------------------------------------------------- #
@@ -508,8 +958,35 @@ class TranscriptAgent:
         self.agent_name = config.agent_name
         self._agent_name_lower = config.agent_name.lower()
         self._triggers = [phrase.lower() for phrase in config.trigger_phrases]
-        self.history: Deque[TranscriptSegment] = deque(maxlen=config.history_size)
+        # With many trigger phrases, scan them all in one DFA pass instead of
+        # one Python-level substring search per phrase.
+        self._trigger_automaton = None
+        if ahocorasick is not None and self._triggers:
+            automaton = ahocorasick.Automaton()
+            for phrase in (self._agent_name_lower, *self._triggers):
+                automaton.add_word(phrase, phrase)
+            automaton.make_automaton()
+            self._trigger_automaton = automaton
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        if config.dataset_enabled and config.dataset_use_tools:
+            self._tools = [DATASET_SEARCH_TOOL]
+        # History is bounded by prompt-token budget rather than a fixed
+        # segment count, so one long monologue cannot blow up GPT latency and
+        # cost; history_size remains as a secondary segment-count ceiling.
+        self.history: Deque[TranscriptSegment] = deque()
+        # The conversation log lives in one contiguous byte buffer that is
+        # maintained incrementally: each segment is formatted and encoded once
+        # on append, eviction left-trims by the recorded line length, and
+        # _build_prompt decodes the buffer in a single pass instead of
+        # re-joining a list of strings per GPT call.
+        self._prompt_buf = bytearray()
+        self._line_lengths: Deque[int] = deque()
+        self._token_counts: Deque[int] = deque()
+        self._token_sum = 0
+        self._count_tokens = _token_counter(config.gpt_model)
+        self._system_message = {"role": "system", "content": config.system_prompt}
         self._response_task: Optional[asyncio.Task[None]] = None
+        self._trigger_pending = False
 
     async def consume(self, watcher: TranscriptWatcher, stop_event: asyncio.Event) -> None:
         try:
@@ -527,9 +1004,40 @@ class TranscriptAgent:
             self._response_task.cancel()
             with suppress(asyncio.CancelledError):
                 await self._response_task
+        for client in (self.gpt_client, self.tts_client, self.dataset_client):
+            if client is not None:
+                await client.aclose()
+
+    def _append_history(self, segment: TranscriptSegment) -> None:
+        line = self._format_prompt_line(segment)
+        tokens = self._count_tokens(line)
+        encoded = line.encode("utf-8") + b"\n"
+        self.history.append(segment)
+        self._prompt_buf.extend(encoded)
+        self._line_lengths.append(len(encoded))
+        self._token_counts.append(tokens)
+        self._token_sum += tokens
+        # Evict oldest segments until the prompt fits the budgets; the newest
+        # segment always survives so there is something to respond to.
+        while len(self.history) > 1 and (
+            self._token_sum > self.config.max_prompt_tokens
+            or len(self.history) > self.config.history_size
+        ):
+            self.history.popleft()
+            del self._prompt_buf[: self._line_lengths.popleft()]
+            self._token_sum -= self._token_counts.popleft()
+
+    @staticmethod
+    def _format_prompt_line(segment: TranscriptSegment) -> str:
+        start = segment.start_time
+        end = segment.end_time
+        timing = ""
+        if isinstance(start, (int, float)) and isinstance(end, (int, float)):
+            timing = f"[{start:.2f}-{end:.2f}] "
+        return f"{timing}{segment.speaker}: {segment.transcript}"
 
     async def handle_segment(self, segment: TranscriptSegment) -> None:
-        self.history.append(segment)
+        self._append_history(segment)
         logging.debug("%s: %s", segment.speaker, segment.transcript)
 
         if self._should_trigger(segment.transcript):
@@ -540,62 +1048,76 @@ class TranscriptAgent:
         lowered = transcript.lower()
         if self._agent_name_lower in lowered:
             return True
+        if self._trigger_automaton is not None:
+            return next(self._trigger_automaton.iter(lowered), None) is not None
         return any(phrase in lowered for phrase in self._triggers)
 
     async def _schedule_response(self) -> None:
         if self._response_task and not self._response_task.done():
-            self._response_task.cancel()
-            with suppress(asyncio.CancelledError):
-                await self._response_task
+            # A cycle is already delayed or in flight. Triggers landing during
+            # the delay are covered by the history snapshot; triggers landing
+            # mid-generation mark a follow-up pass instead of cancelling the
+            # in-flight GPT call and wasting its compute.
+            self._trigger_pending = True
+            return
 
         self._response_task = asyncio.create_task(self._respond_after_delay())
 
     async def _respond_after_delay(self) -> None:
         try:
-            await asyncio.sleep(self.config.response_delay)
-            await self._generate_response()
+            while True:
+                await asyncio.sleep(self.config.response_delay)
+                # Everything that arrived up to this point is in history and
+                # will be part of this response.
+                self._trigger_pending = False
+                await self._generate_response()
+                if not self._trigger_pending:
+                    return
         except asyncio.CancelledError:
             logging.debug("Deferred response cancelled before execution.")
 
     def _persist_agent_response(self, response_text: str) -> None:
-        """Write the agent's response to the transcript dataset file."""
+        """Write the agent's response to the transcript dataset file.
+
+        Live sessions keep the dataset in JSONL form (see the transcriber's
+        persist_dataset), so the common case is a single append. Legacy
+        array-form files fall back to the old read-modify-rewrite.
+        """
+        entry = {"speaker": self.agent_name, "transcript": response_text}
         try:
             transcript_path = self.config.transcript_path
-            
-            # Read existing transcripts
+            transcript_path.parent.mkdir(parents=True, exist_ok=True)
+
+            is_array = False
             if transcript_path.exists():
+                with open(transcript_path, "rb") as f:
+                    is_array = f.read(1) == b"["
+
+            if is_array:
                 try:
-                    with open(transcript_path, 'r', encoding='utf-8') as f:
+                    with open(transcript_path, "r", encoding="utf-8") as f:
                         transcripts = json.load(f)
                     if not isinstance(transcripts, list):
                         transcripts = []
                 except (json.JSONDecodeError, IOError):
                     transcripts = []
+                transcripts.append(entry)
+                with open(transcript_path, "w", encoding="utf-8") as f:
+                    f.write(json.dumps(transcripts, ensure_ascii=False))
             else:
-                transcripts = []
-            
-            # Append agent response
-            transcripts.append({
-                "speaker": self.agent_name,
-                "transcript": response_text
-            })
-            
-            # Write back to file
-            transcript_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(transcript_path, 'w', encoding='utf-8') as f:
-                json.dump(transcripts, f, indent=2, ensure_ascii=False)
-            
+                with open(transcript_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
             logging.debug("Persisted agent response to %s", transcript_path)
         except Exception as exc:
             logging.error("Failed to persist agent response: %s", exc)
 
     async def _generate_response(self) -> None:
-        history_snapshot = list(self.history)
-        if not history_snapshot:
+        if not self.history:
             logging.debug("No history available when attempting to respond.")
             return
 
-        messages = self._build_prompt(history_snapshot)
+        messages = self._build_prompt()
         if not messages:
             logging.debug("Prompt construction produced no messages; skipping response.")
             return
@@ -604,82 +1126,152 @@ class TranscriptAgent:
             logging.error("GPT client not configured; cannot generate response.")
             return
 
-        response_text = await self.gpt_client.chat_completion(messages)
-        if not response_text:
-            logging.warning("GPT returned no content; skipping TTS.")
+        response_message = await self.gpt_client.chat_message(messages, tools=self._tools)
+        if response_message is None:
+            logging.warning("GPT returned no message; skipping TTS.")
             return
+        response_text = (response_message.get("content") or "").strip()
 
-        search_command: Optional[DatasetSearchCommand] = None
-        if self.dataset_client and self.dataset_client.enabled:
-            search_command = self._extract_search_command(response_text)
-            if search_command:
-                logging.info("Extracted dataset search command: %s", search_command.text)
-
-        messages_for_followup = list(messages)
         dataset_result: Optional[str] = None
+        tool_call = self._pick_dataset_tool_call(response_message)
+
+        if tool_call and self.dataset_client and self.dataset_client.enabled:
+            # Native tool calling: the API already parsed the search payload,
+            # so one follow-up request finishes the turn.
+            try:
+                payload = json.loads(tool_call["function"].get("arguments") or "{}")
+            except (json.JSONDecodeError, TypeError):
+                logging.warning("Dataset tool call had malformed arguments; skipping search.")
+                payload = None
+
+            if isinstance(payload, dict) and payload:
+                logging.info("%s initiating dataset search via tool call: %s", self.agent_name, payload)
+                self._append_history(
+                    TranscriptSegment(
+                        speaker=self.agent_name,
+                        transcript=f"searching {json.dumps(payload)}",
+                        start_time=None,
+                        end_time=None,
+                        generated=True,
+                    )
+                )
 
-        if search_command and self.dataset_client:
-            logging.info("%s initiating dataset search: %s", self.agent_name, search_command.text)
-            self.history.append(
-                TranscriptSegment(
-                    speaker=self.agent_name,
-                    transcript=search_command.text,
-                    start_time=None,
-                    end_time=None,
-                    raw={"generated": True, "dataset_query": search_command.payload},
+                # Speak the filler while the dataset query and the follow-up
+                # GPT request run; the acknowledgement covers the whole wait.
+                async with asyncio.TaskGroup() as tg:
+                    if self.tts_client:
+                        tg.create_task(self.tts_client.synthesize(DATASET_FILLER_PHRASE))
+
+                    dataset_result = await self.dataset_client.query(payload)
+                    logging.info("Dataset result received: %s", dataset_result[:200] if dataset_result else "None")
+
+                    messages_for_followup = list(messages)
+                    messages_for_followup.append(response_message)
+                    messages_for_followup.append(
+                        {
+                            "role": "tool",
+                            "tool_call_id": tool_call.get("id", ""),
+                            "content": dataset_result,
+                        }
+                    )
+                    response_text = await self.gpt_client.chat_completion(messages_for_followup)
+                if not response_text:
+                    logging.warning("GPT returned no content after dataset search; skipping TTS.")
+                    return
+        elif response_text:
+            # Legacy prompt protocol fallback (providers without tool calling).
+            search_command: Optional[DatasetSearchCommand] = None
+            if self.dataset_client and self.dataset_client.enabled:
+                search_command = self._extract_search_command(response_text)
+                if search_command:
+                    logging.info("Extracted dataset search command: %s", search_command.text)
+
+            if search_command and self.dataset_client:
+                logging.info("%s initiating dataset search: %s", self.agent_name, search_command.text)
+                self._append_history(
+                    TranscriptSegment(
+                        speaker=self.agent_name,
+                        transcript=search_command.text,
+                        start_time=None,
+                        end_time=None,
+                        generated=True,
+                    )
                 )
-            )
 
-            dataset_result = await self.dataset_client.query(search_command.payload)
-            logging.info("Dataset result received: %s", dataset_result[:200] if dataset_result else "None")
-            
-            messages_for_followup.append({"role": "assistant", "content": search_command.text})
-            messages_for_followup.append(
-                {
-                    "role": "system",
-                    "content": f"Dataset search results:\n{dataset_result}",
-                }
-            )
+                async with asyncio.TaskGroup() as tg:
+                    if self.tts_client:
+                        tg.create_task(self.tts_client.synthesize(DATASET_FILLER_PHRASE))
 
-            response_text = await self.gpt_client.chat_completion(messages_for_followup)
-            if not response_text:
-                logging.warning("GPT returned no content after dataset search; skipping TTS.")
-                return
+                    dataset_result = await self.dataset_client.query(search_command.payload)
+                    logging.info("Dataset result received: %s", dataset_result[:200] if dataset_result else "None")
+
+                    messages_for_followup = list(messages)
+                    messages_for_followup.append({"role": "assistant", "content": search_command.text})
+                    messages_for_followup.append(
+                        {
+                            "role": "system",
+                            "content": f"Dataset search results:\n{dataset_result}",
+                        }
+                    )
+
+                    response_text = await self.gpt_client.chat_completion(messages_for_followup)
+                if not response_text:
+                    logging.warning("GPT returned no content after dataset search; skipping TTS.")
+                    return
+
+        if not response_text:
+            logging.warning("GPT returned no content; skipping TTS.")
+            return
 
         logging.info("%s reply: %s", self.agent_name, response_text)
-        
-        # Persist the agent's response to the transcript file
-        self._persist_agent_response(response_text)
-        
-        self.history.append(
+
+        self._append_history(
             TranscriptSegment(
                 speaker=self.agent_name,
                 transcript=response_text,
                 start_time=None,
                 end_time=None,
-                raw={"generated": True, "dataset_result": dataset_result} if dataset_result else {"generated": True},
+                generated=True,
             )
         )
 
-        if self.tts_client:
-            audio_path = await self.tts_client.synthesize(response_text)
+        # Synthesis and the transcript persist are independent; run them in
+        # one task group so the disk write stays off the audio critical path.
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(asyncio.to_thread(self._persist_agent_response, response_text))
+            tg.create_task(self._speak(response_text))
+
+    async def _speak(self, text: str) -> None:
+        """Synthesize a reply, publishing the first sentence early.
+
+        The opening sentence is synthesized on its own so playback can begin
+        while the remainder is still streaming from the TTS provider.
+        """
+        if not self.tts_client:
+            return
+
+        first_sentence, rest = self._split_first_sentence(text)
+        for part in (first_sentence, rest):
+            if not part:
+                continue
+            audio_path = await self.tts_client.synthesize(part)
             if audio_path:
                 logging.debug("Audio response saved to %s", audio_path)
 
-    def _build_prompt(self, history: Iterable[TranscriptSegment]) -> List[Dict[str, str]]:
-        lines: List[str] = []
-        for segment in history:
-            start = segment.start_time
-            end = segment.end_time
-            timing = ""
-            if isinstance(start, (int, float)) and isinstance(end, (int, float)):
-                timing = f"[{start:.2f}-{end:.2f}] "
-            lines.append(f"{timing}{segment.speaker}: {segment.transcript}")
-
-        if not lines:
+    @staticmethod
+    def _split_first_sentence(text: str) -> tuple[str, str]:
+        """Split text at the first sentence boundary; rest may be empty."""
+        match = re.search(r"(?<=[.!?])\s+", text)
+        if match is None:
+            return text, ""
+        return text[: match.start()], text[match.end() :]
+
+    def _build_prompt(self) -> List[Dict[str, str]]:
+        if not self._prompt_buf:
             return []
 
-        conversation_log = "\n".join(lines)
+        # One decode of the maintained buffer; drop the trailing newline.
+        conversation_log = str(memoryview(self._prompt_buf)[:-1], "utf-8")
         user_prompt = (
             f"{conversation_log}\n\n"
             f"Respond as {self.agent_name} to the latest request that references you. "
@@ -687,62 +1279,36 @@ class TranscriptAgent:
         )
 
         return [
-            {"role": "system", "content": self.config.system_prompt},
+            self._system_message,
             {"role": "user", "content": user_prompt},
         ]
 
+    @staticmethod
+    def _pick_dataset_tool_call(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for call in message.get("tool_calls") or []:
+            if (call.get("function") or {}).get("name") == "dataset_search":
+                return call
+        return None
+
     def _extract_search_command(self, text: str) -> Optional[DatasetSearchCommand]:
         if not text:
             return None
-        
-        # First, remove code blocks from the entire text
-        cleaned_text = text.strip()
-        
-        # Handle multi-line code blocks (``` or more backticks)
-        lines = cleaned_text.split('\n')
-        cleaned_lines = []
-        in_code_block = False
-        
-        for line in lines:
-            stripped = line.strip()
-            # Check if line starts with backticks (code block delimiter)
-            if stripped.startswith('```'):
-                in_code_block = not in_code_block
-                continue
-            # Skip language identifiers after opening code blocks
-            if not in_code_block or stripped not in ('json', 'javascript', 'python', ''):
-                cleaned_lines.append(line)
-        
-        # Rejoin the cleaned content
-        cleaned_text = '\n'.join(cleaned_lines).strip()
-        
-        # Also handle inline code blocks (single backticks around entire content)
-        if cleaned_text.startswith('`') and cleaned_text.endswith('`'):
-            cleaned_text = cleaned_text[1:-1].strip()
-        
-        # Now look for the searching prefix
-        prefix = "searching"
-        text_lower = cleaned_text.lower().strip()
-        
-        if prefix not in text_lower:
-            return None
-            
-        # Find the start of the JSON payload
-        start_idx = cleaned_text.lower().find(prefix) + len(prefix)
-        remainder = cleaned_text[start_idx:].strip()
-        
-        if not remainder:
-            logging.warning("Search command found but no JSON payload")
+
+        # Single C-level scan: find "searching" (optionally inside a code
+        # fence) and the opening brace of its payload, then let raw_decode
+        # parse the object and ignore whatever trails it (closing fences etc).
+        match = _SEARCH_COMMAND_RE.search(text)
+        if not match:
             return None
-        
+
         try:
-            payload = json.loads(remainder)
-        except json.JSONDecodeError as e:
-            logging.warning("Unable to parse dataset search payload: %s (Error: %s)", remainder, e)
+            payload, _ = _JSON_DECODER.raw_decode(text, match.start(1))
+        except json.JSONDecodeError as exc:
+            logging.warning("Unable to parse dataset search payload: %s (Error: %s)", text[match.start(1):], exc)
             return None
-            
+
         if not isinstance(payload, dict):
-            logging.warning("Dataset search payload must be an object: %s", remainder)
+            logging.warning("Dataset search payload must be an object: %s", text[match.start(1):])
             return None
         return DatasetSearchCommand(text=text, payload=payload)
 
@@ -770,6 +1336,7 @@ async def _run() -> None:
             api_key=config.gpt_api_key,
             model=config.gpt_model,
             timeout=config.gpt_timeout,
+            rpm=config.gpt_rpm,
         )
 
     tts_client = ElevenLabsTTSClient(config) if config.elevenlabs_enabled else None
@@ -1,29 +1,44 @@
 import os
 import sys
 import json
+import asyncio
 from google import genai
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Text agent entrypoint and function. Reads GENAI_API_KEY from environment.
-API_KEY = os.getenv("GENAI_API_KEY") 
+API_KEY = os.getenv("GENAI_API_KEY")
+MODEL = "gemini-2.5-flash"
+
+# Lazily created, reused across calls so repeat generations skip the TLS
+# handshake and connection-pool setup of a fresh client.
+_client = None
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = genai.Client(api_key=API_KEY)
+    return _client
 
-def generate_text(prompt: str) -> str:
-    """Generate text using GenAI and persist to `text_agent_output.json`.
 
-    Returns the generated text.
+async def generate(prompts: list[str]) -> list[str]:
+    """Generate text for several prompts concurrently via the async client.
+
+    N prompts cost roughly one round trip of wall time instead of N.
+    Returns the generated texts in prompt order.
     """
-    client = genai.Client(api_key=API_KEY)
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
+    client = _get_client()
+    responses = await asyncio.gather(
+        *(client.aio.models.generate_content(model=MODEL, contents=p) for p in prompts)
     )
-    output = {"text_output": response.text}
-    # write (overwrite) the output file so UI can read latest
-    with open("text_agent_output.json", "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2)
-    return response.text
+    return [response.text for response in responses]
+
+
+def generate_text(prompt: str) -> str:
+    """Generate text using GenAI and return it."""
+    return asyncio.run(generate([prompt]))[0]
 
 
 if __name__ == "__main__":
@@ -31,7 +46,10 @@ if __name__ == "__main__":
     prompt = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "what is the meaning of life"
     try:
         text = generate_text(prompt)
-        print(text)
+        # JSON on stdout is the IPC surface: a parent process parses this
+        # directly from the pipe instead of racing other sessions over a
+        # shared output file on disk.
+        print(json.dumps({"text_output": text}))
     except Exception as exc:
-        print(f"Error generating text: {exc}")
+        print(f"Error generating text: {exc}", file=sys.stderr)
         raise
@@ -1,6 +1,10 @@
 # aws_test.py — AgentVerse
 import asyncio
+import atexit
 import json
+import queue
+import sys
+import threading
 import sounddevice as sd
 from pathlib import Path
 
@@ -11,73 +15,281 @@ AWS_REGION = "eu-west-2"
 LANGUAGE_CODE = "en-GB"
 SAMPLE_RATE = 16000
 MEDIA_ENCODING = "pcm"
+# 100 ms of audio per chunk sent to Transcribe.
+BLOCK_FRAMES = int(SAMPLE_RATE * 0.1)
+
+# Per-utterance status lines are batched to stderr so the event loop pays one
+# write() per _STATUS_BATCH events instead of a syscall per print; stderr
+# (not stdout) so structured output can own stdout.
+_STATUS_BATCH = 10
+_status_out = sys.stderr.buffer
+_status_pending = []
+
+
+def emit_status(line):
+    """Queue a human-readable status line; flushed every _STATUS_BATCH lines."""
+    _status_pending.append(line.encode("utf-8", "replace") + b"\n")
+    if len(_status_pending) >= _STATUS_BATCH:
+        flush_status()
+
+
+def flush_status():
+    if not _status_pending:
+        return
+    try:
+        _status_out.write(b"".join(_status_pending))
+        _status_out.flush()
+    except OSError:
+        pass
+    _status_pending.clear()
+
+
+atexit.register(flush_status)
+
+# stdout carries one compact JSON line per finalized transcript so a parent
+# process (the Streamlit viewer) can consume results straight off the pipe
+# instead of re-reading the dataset file from disk.
+_ipc_out = sys.stdout.buffer
+
+
+def emit_transcript(entry):
+    """Write one JSON line for ``entry`` to the stdout IPC pipe."""
+    try:
+        _ipc_out.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+        _ipc_out.flush()
+    except OSError:
+        pass
 
 client = TranscribeStreamingClient(region=AWS_REGION)
 DATASET_PATH = Path(__file__).parent.parent.parent / "frontend" / "transcripts_dataset.json"
 TRANSCRIPT_DATA = []
 
+# Live sessions keep the dataset in JSONL form (one entry per line) so each
+# utterance costs one append instead of rewriting the whole list; the file is
+# rewritten as a JSON array on clean exit by finalize_dataset().
+_dataset_fp = None
+
+# Entries are handed to a background writer thread that group-commits them:
+# up to FLUSH_BATCH entries (or whatever arrived within FLUSH_INTERVAL
+# seconds) go to disk in a single write+flush, keeping syscalls off the
+# transcription event loop entirely.
+FLUSH_BATCH = 64
+FLUSH_INTERVAL = 0.2
+
+# The dataset file is opened binary with a 128 KiB buffer (default is 8 KiB)
+# and batches are formatted into one reusable bytearray, so each flush is a
+# single write() with no per-entry allocation churn.
+_DATASET_BUF_SIZE = 128 * 1024
+_write_buf = bytearray(_DATASET_BUF_SIZE)
+
+_write_queue = queue.Queue()
+_writer_thread = None
+_WRITER_STOP = object()
+
+
+def _dataset_writer():
+    """Drain the write queue, batching entries into single writes."""
+    global _write_buf
+    pending = []
+    while True:
+        try:
+            item = _write_queue.get(timeout=FLUSH_INTERVAL)
+        except queue.Empty:
+            item = None
+        stopping = item is _WRITER_STOP
+        if item is not None and not stopping:
+            pending.append(item)
+            while len(pending) < FLUSH_BATCH:
+                try:
+                    nxt = _write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _WRITER_STOP:
+                    stopping = True
+                    break
+                pending.append(nxt)
+        if pending and _dataset_fp is not None:
+            del _write_buf[:]
+            for e in pending:
+                _write_buf += json.dumps(e, separators=(",", ":")).encode("utf-8")
+                _write_buf += b"\n"
+            try:
+                _dataset_fp.write(_write_buf)
+                _dataset_fp.flush()
+            except OSError as exc:
+                print(f"⚠️ Unable to write dataset: {exc}", file=sys.stderr)
+            # An unusually large batch shouldn't pin its memory forever.
+            if len(_write_buf) > _DATASET_BUF_SIZE:
+                _write_buf = bytearray(_DATASET_BUF_SIZE)
+            pending.clear()
+        if stopping:
+            return
+
 
 def load_existing_dataset():
-    """Populate in-memory dataset if a previous run left data on disk."""
-    if not DATASET_PATH.exists():
-        return
-    try:
-        TRANSCRIPT_DATA.extend(json.loads(DATASET_PATH.read_text(encoding="utf-8")))
-    except json.JSONDecodeError:
-        print("⚠️ Existing dataset file is not valid JSON; starting fresh.")
+    """Populate in-memory dataset if a previous run left data on disk.
 
+    Accepts both the finalized JSON-array form and the live JSONL form,
+    then reopens the file as JSONL for this session's appends.
+    """
+    global _dataset_fp
+    if DATASET_PATH.exists():
+        try:
+            content = DATASET_PATH.read_text(encoding="utf-8").lstrip()
+            if content.startswith("["):
+                TRANSCRIPT_DATA.extend(json.loads(content))
+            else:
+                for line in content.splitlines():
+                    line = line.strip()
+                    if line:
+                        TRANSCRIPT_DATA.append(json.loads(line))
+        except json.JSONDecodeError:
+            print("⚠️ Existing dataset file is not valid JSON; starting fresh.", file=sys.stderr)
+            TRANSCRIPT_DATA.clear()
 
-def persist_dataset():
-    """Write the accumulated transcript data to disk."""
     try:
         DATASET_PATH.parent.mkdir(parents=True, exist_ok=True)
-        DATASET_PATH.write_text(json.dumps(TRANSCRIPT_DATA, indent=2), encoding="utf-8")
+        # Rewrite the file once, then hold it in append mode: O_APPEND puts
+        # every write atomically at EOF, so lines appended concurrently by
+        # other writers (e.g. the live-chat agent's replies) can interleave
+        # with this session's batches but never be overwritten by them.
+        with open(DATASET_PATH, "wb") as seed_fp:
+            if TRANSCRIPT_DATA:
+                seed_fp.write(
+                    b"".join(
+                        json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+                        for entry in TRANSCRIPT_DATA
+                    )
+                )
+        _dataset_fp = open(DATASET_PATH, "ab", buffering=_DATASET_BUF_SIZE)
     except OSError as exc:
-        print(f"⚠️ Unable to write dataset: {exc}")
+        print(f"⚠️ Unable to open dataset for writing: {exc}", file=sys.stderr)
+        _dataset_fp = None
+        return
+
+    global _writer_thread
+    _writer_thread = threading.Thread(target=_dataset_writer, name="dataset-writer", daemon=True)
+    _writer_thread.start()
+
+
+def persist_dataset(entry):
+    """Queue a single entry for the background writer thread."""
+    if _dataset_fp is None:
+        return
+    _write_queue.put(entry)
+
+
+def finalize_dataset():
+    """Rewrite the live JSONL file in its JSON-array form on exit.
+
+    Converts from the file rather than TRANSCRIPT_DATA so lines appended by
+    other writers (e.g. the live-chat agent's replies) survive the rewrite.
+    """
+    global _dataset_fp, _writer_thread
+    try:
+        if _writer_thread is not None and _writer_thread.is_alive():
+            _write_queue.put(_WRITER_STOP)
+            _writer_thread.join(timeout=2)
+        _writer_thread = None
+        if _dataset_fp is not None:
+            _dataset_fp.close()
+            _dataset_fp = None
+        if not DATASET_PATH.exists():
+            return
+        content = DATASET_PATH.read_text(encoding="utf-8")
+        if content.lstrip().startswith("["):
+            # Already finalized (e.g. by a previous run's exit hook);
+            # rewrapping would nest the array inside another array.
+            return
+        entries = []
+        for line in content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        DATASET_PATH.write_text(
+            json.dumps(entries, separators=(",", ":")), encoding="utf-8"
+        )
+    except OSError as exc:
+        print(f"⚠️ Unable to finalize dataset: {exc}", file=sys.stderr)
+
+
+atexit.register(finalize_dataset)
 
 
 def resolve_speaker(result, alternative):
     """Try to determine which speaker produced the alternative."""
-    items = getattr(alternative, "items", None) or []
-    for item in items:
-        speaker = getattr(item, "speaker", None)
-        if speaker:
-            return speaker
+    items = getattr(alternative, "items", None) or ()
+    _get = getattr
+    speaker = next((s for item in items if (s := _get(item, "speaker", None))), None)
+    if speaker:
+        return speaker
     channel_id = getattr(result, "channel_id", None)
     if channel_id:
         return f"channel_{channel_id}"
     return "Unknown"
 
 
-def add_dataset_entry(result, alternative, transcript_text):
-    """Persist the transcript text along with timing and speaker data."""
+async def add_dataset_entry(result, alternative, transcript_text):
+    """Persist the transcript text along with timing and speaker data.
+
+    Async so the transcript coroutine never blocks on persistence: the
+    in-memory append and queue hand-off are cheap, and the writer thread
+    owns every disk syscall.
+    """
     speaker = resolve_speaker(result, alternative)
     entry = {
         "speaker": speaker,
         "transcript": transcript_text
     }
     TRANSCRIPT_DATA.append(entry)
-    persist_dataset()
+    emit_transcript(entry)
+    await asyncio.to_thread(persist_dataset, entry)
     return speaker
 
 
 load_existing_dataset()
 
 async def mic_audio_generator():
-    """Yields audio chunks for streaming."""
-    sd.default.samplerate = SAMPLE_RATE
-    sd.default.channels = 1
+    """Yields audio chunks for streaming.
+
+    PortAudio runs in callback mode on its own audio thread and pushes raw
+    PCM chunks onto a bounded asyncio.Queue, so the event loop never blocks
+    in stream.read and stays responsive for send_audio/process_events. When
+    the queue is full the newest chunk is dropped, bounding memory.
+    """
+    loop = asyncio.get_running_loop()
+    audio_queue = asyncio.Queue(maxsize=8)
+
+    def _enqueue(chunk):
+        try:
+            audio_queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            pass
+
+    def callback(indata, frames, time_info, status):
+        if status:
+            print(f"⚠️ Audio input status: {status}", file=sys.stderr)
+        try:
+            loop.call_soon_threadsafe(_enqueue, bytes(indata))
+        except RuntimeError:
+            pass  # event loop already closed during shutdown
+
     with sd.RawInputStream(
         samplerate=SAMPLE_RATE,
         channels=1,
         dtype='int16',
-        blocksize=int(SAMPLE_RATE * 0.1)
-    ) as stream:
-        print("🎙️ Streaming audio… (Ctrl-C to stop)")
+        blocksize=BLOCK_FRAMES,
+        callback=callback
+    ):
+        print("🎙️ Streaming audio… (Ctrl-C to stop)", file=sys.stderr)
         while True:
-            data, _ = stream.read(int(SAMPLE_RATE * 0.1))
+            chunk = await audio_queue.get()
             # AudioEvent expects raw PCM bytes; no base64 encoding
-            yield AudioEvent(audio_chunk=data if isinstance(data, bytes) else bytes(data))
+            yield AudioEvent(audio_chunk=chunk)
 
 async def transcribe_stream():
     stream = await client.start_stream_transcription(
@@ -106,8 +318,8 @@ async def transcribe_stream():
                         transcript_text = (alt.transcript or "").strip()
                         if not transcript_text:
                             continue
-                        speaker = add_dataset_entry(result, alt, transcript_text)
-                        print(f"🗣️ {speaker}: {transcript_text}")
+                        speaker = await add_dataset_entry(result, alt, transcript_text)
+                        emit_status(f"🗣️ {speaker}: {transcript_text}")
             # Speaker label events (if provided by the service/library)
             speaker_labels = getattr(event, "speaker_labels", None)
             if speaker_labels and hasattr(speaker_labels, "segments"):
@@ -115,10 +327,14 @@ async def transcribe_stream():
                     spkr = getattr(seg, "speaker_label", "Unknown")
                     st = getattr(seg, "start_time", 0.0) or 0.0
                     en = getattr(seg, "end_time", st or 0.0)
-                    print(f"➤ {spkr} spoke from {st:.2f}s to {en:.2f}s")
+                    emit_status(f"➤ {spkr} spoke from {st:.2f}s to {en:.2f}s")
 
-    # Run both tasks concurrently
-    await asyncio.gather(send_audio(), process_events())
+    # Run both tasks concurrently; TaskGroup cancels the sibling when either
+    # side fails, so a mic error or closed stream tears the pipeline down
+    # cleanly instead of leaving an orphan coroutine behind.
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(send_audio())
+        tg.create_task(process_events())
 
 async def main():
     await transcribe_stream()
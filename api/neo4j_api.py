@@ -1,20 +1,137 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from neo4j import GraphDatabase
+import json
 import os
+import re
+import threading
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional dependency, stdlib fallback
+    orjson = None
+
+# Rust-backed parse/serialize on the request hot path when available; both
+# raise ValueError subclasses on bad input, and both emit/accept bytes.
+if orjson is not None:
+    _loads = orjson.loads
+    _dumps_bytes = orjson.dumps
+else:
+    _loads = json.loads
+
+    def _dumps_bytes(obj):
+        return json.dumps(obj).encode('utf-8')
+
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 
+# Rows per UNWIND statement; keeps individual transactions a reasonable size
+# on large payloads while still batching ~1000x fewer round-trips.
+BATCH_SIZE = 1000
+
+
+def _chunks(rows, size=BATCH_SIZE):
+    """Yield successive ``size``-sized slices of ``rows``."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+_IDENT_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _safe_ident(name):
+    """Validate a label or relationship type before it enters a query string.
+
+    Labels and types cannot be sent as query parameters, so the identifiers
+    that do get interpolated are whitelisted to word characters; anything
+    else is rejected before it reaches Cypher.
+    """
+    if not isinstance(name, str) or not _IDENT_RE.match(name):
+        raise ValueError(f"Invalid label or relationship type: {name!r}")
+    return name
+
+
 class Neo4jClient:
     def __init__(self, uri, user, password):
         """Initialize Neo4j connection"""
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
-    
+        # Labels that already have an id index; without one every MERGE on
+        # (n:Label {id: ...}) is a full label scan.
+        self._indexed = set()
+        # Templated statements per label/type, so the server sees the exact
+        # same query text on every call and its plan cache keeps hitting.
+        self._stmt_cache = {}
+        # One long-lived session per worker thread instead of a fresh bolt
+        # session per request; created lazily, all closed in close(). Tracked
+        # as (owner_thread, session) pairs so sessions whose thread has exited
+        # can be reclaimed — the Flask dev server spawns a thread per request,
+        # and without the sweep every request would leak a bolt session.
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    def _session(self):
+        """Return this thread's long-lived session, creating it on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self.driver.session()
+            self._local.session = session
+            with self._sessions_lock:
+                live = []
+                for thread, tracked in self._sessions:
+                    if thread.is_alive():
+                        live.append((thread, tracked))
+                    else:
+                        try:
+                            tracked.close()
+                        except Exception:
+                            pass
+                live.append((threading.current_thread(), session))
+                self._sessions = live
+        return session
+
+    def _node_stmt(self, label):
+        """Return the cached UNWIND/MERGE statement for a node label."""
+        return self._stmt_cache.setdefault(
+            ('n', label),
+            f"UNWIND $rows AS r MERGE (n:{label} {{id: r.id}}) SET n += r.props"
+        )
+
+    def _rel_stmt(self, rel_type, from_label, to_label):
+        """Return the cached UNWIND/MERGE statement for a relationship key."""
+        key = ('r', rel_type, from_label, to_label)
+        stmt = self._stmt_cache.get(key)
+        if stmt is None:
+            a_pattern = f"(a:{from_label} {{id: r.from}})" if from_label else "(a {id: r.from})"
+            b_pattern = f"(b:{to_label} {{id: r.to}})" if to_label else "(b {id: r.to})"
+            stmt = (
+                "UNWIND $rows AS r "
+                f"MATCH {a_pattern}, {b_pattern} "
+                f"MERGE (a)-[x:{rel_type}]->(b) "
+                "SET x += r.props"
+            )
+            self._stmt_cache[key] = stmt
+        return stmt
+
+    def ensure_index(self, label):
+        """Create the id index for a label once per process."""
+        if label in self._indexed:
+            return
+        label = _safe_ident(label)
+        self._session().run(f"CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.id)").consume()
+        self._indexed.add(label)
+
     def close(self):
-        """Close the connection"""
+        """Close all thread-local sessions and the connection"""
+        with self._sessions_lock:
+            for _thread, session in self._sessions:
+                try:
+                    session.close()
+                except Exception:
+                    pass
+            self._sessions.clear()
         self.driver.close()
     
     def create_graph_from_json(self, graph_data):
@@ -29,52 +146,77 @@ class Neo4jClient:
             ],
             "relationships": [
                 {
-                    "from": "1", 
-                    "to": "2", 
-                    "type": "WORKS_AT", 
+                    "from": "1",
+                    "to": "2",
+                    "type": "WORKS_AT",
+                    "from_label": "Person",   // optional, lets MATCH use the id index
+                    "to_label": "Company",    // optional
                     "properties": {"since": 2020}
                 }
             ]
         }
         """
-        with self.driver.session() as session:
-            # Create nodes
-            for node in graph_data.get("nodes", []):
-                session.run(
-                    f"MERGE (n:{node['label']} {{id: $id}}) SET n += $properties",
-                    id=node['id'],
-                    properties=node.get('properties', {})
-                )
-            
-            # Create relationships
-            for rel in graph_data.get("relationships", []):
-                session.run(
-                    f"""
-                    MATCH (a {{id: $from_id}}), (b {{id: $to_id}})
-                    MERGE (a)-[r:{rel['type']}]->(b)
-                    SET r += $properties
-                    """,
-                    from_id=rel['from'],
-                    to_id=rel['to'],
-                    properties=rel.get('properties', {})
-                )
-            
-            return {
-                "status": "success", 
-                "nodes_created": len(graph_data.get("nodes", [])), 
-                "relationships_created": len(graph_data.get("relationships", []))
-            }
+        # Group rows so each label/type becomes one UNWIND statement per batch
+        # instead of one auto-committed round-trip per node/relationship.
+        nodes_by_label = {}
+        for node in graph_data.get("nodes", []):
+            nodes_by_label.setdefault(_safe_ident(node['label']), []).append(
+                {"id": node['id'], "props": node.get('properties', {})}
+            )
+
+        # Group by (type, endpoint labels): labelled MATCH patterns let the
+        # planner use the id indexes instead of scanning all nodes.
+        rels_by_key = {}
+        for rel in graph_data.get("relationships", []):
+            key = (
+                _safe_ident(rel['type']),
+                _safe_ident(rel['from_label']) if rel.get('from_label') else None,
+                _safe_ident(rel['to_label']) if rel.get('to_label') else None,
+            )
+            rels_by_key.setdefault(key, []).append(
+                {"from": rel['from'], "to": rel['to'], "props": rel.get('properties', {})}
+            )
+
+        for label in nodes_by_label:
+            self.ensure_index(label)
+        for _, from_label, to_label in rels_by_key:
+            for label in (from_label, to_label):
+                if label:
+                    self.ensure_index(label)
+
+        with self._session().begin_transaction() as tx:
+            for label, rows in nodes_by_label.items():
+                stmt = self._node_stmt(label)
+                for batch in _chunks(rows):
+                    tx.run(stmt, rows=batch)
+
+            for (rel_type, from_label, to_label), rows in rels_by_key.items():
+                stmt = self._rel_stmt(rel_type, from_label, to_label)
+                for batch in _chunks(rows):
+                    tx.run(stmt, rows=batch)
+
+            tx.commit()
+
+        return {
+            "status": "success",
+            "nodes_created": len(graph_data.get("nodes", [])),
+            "relationships_created": len(graph_data.get("relationships", []))
+        }
     
     def query_graph(self, cypher_query, parameters=None):
-        """Execute a custom Cypher query"""
-        with self.driver.session() as session:
-            result = session.run(cypher_query, parameters or {})
-            return [record.data() for record in result]
-    
+        """Execute a custom Cypher query, yielding one record dict at a time.
+
+        Records stream from the cursor as they arrive instead of being
+        materialized into a list, so peak memory stays O(record) and the
+        first rows can be sent to the client immediately.
+        """
+        result = self._session().run(cypher_query, parameters or {})
+        for record in result:
+            yield record.data()
+
     def delete_database(self):
         """Delete all nodes and relationships from the database"""
-        with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+        self._session().run("MATCH (n) DETACH DELETE n").consume()
         return {"status": "success", "message": "Database cleared"}
 
 # Initialize Neo4j client
@@ -87,6 +229,19 @@ if not URI or not PASSWORD:
 
 neo4j_client = Neo4jClient(URI, USER, PASSWORD)
 
+
+def _stream_query_json(first, records):
+    """Yield a {"result": [...], "count": N} JSON body one record at a time."""
+    yield b'{"result":['
+    count = 0
+    if first is not None:
+        yield _dumps_bytes(first)
+        count = 1
+    for record in records:
+        yield (b',' + _dumps_bytes(record)) if count else _dumps_bytes(record)
+        count += 1
+    yield b'],"count":%d}' % count
+
 # Routes
 @app.route('/')
 def home():
@@ -96,8 +251,8 @@ def home():
 def health_check():
     """Check if Neo4j connection is working"""
     try:
-        result = neo4j_client.query_graph("RETURN 'connected' AS status")
-        return jsonify({"status": "healthy", "neo4j": result[0]}), 200
+        result = next(neo4j_client.query_graph("RETURN 'connected' AS status"), None)
+        return jsonify({"status": "healthy", "neo4j": result}), 200
     except Exception as e:
         return jsonify({"status": "unhealthy", "error": str(e)}), 500
 
@@ -113,17 +268,21 @@ def push_graph():
     }
     """
     try:
-        graph_data = request.get_json()
-        
+        raw = request.get_data(cache=False)
+        try:
+            graph_data = _loads(raw) if raw else None
+        except ValueError:
+            return jsonify({"error": "Invalid JSON"}), 400
+
         if not graph_data:
             return jsonify({"error": "No JSON data provided"}), 400
-        
+
         if "nodes" not in graph_data:
             return jsonify({"error": "Missing 'nodes' field in JSON"}), 400
-        
+
         result = neo4j_client.create_graph_from_json(graph_data)
-        return jsonify(result), 200
-    
+        return Response(_dumps_bytes(result), mimetype='application/json'), 200
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -142,7 +301,12 @@ def query_graph():
     }
     """
     try:
-        data = request.get_json()
+        raw = request.get_data(cache=False)
+        try:
+            data = _loads(raw) if raw else None
+        except ValueError:
+            return jsonify({"error": "Invalid JSON"}), 400
+
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
 
@@ -152,20 +316,28 @@ def query_graph():
             parameters = data.get("parameters", {})
         # Otherwise, build query from label/property/value
         elif "label" in data and "property" in data:
+            # Fully parameterized: one cached plan serves every label/property
+            # search, and user input never reaches the query text.
             label = data["label"]
             prop = data["property"]
             value = data.get("value")
             if value is not None:
-                cypher_query = f"MATCH (n:{label}) WHERE n.{prop} = $value RETURN n"
-                parameters = {"value": value}
+                cypher_query = "MATCH (n) WHERE $label IN labels(n) AND n[$prop] = $value RETURN n"
+                parameters = {"label": label, "prop": prop, "value": value}
             else:
-                cypher_query = f"MATCH (n:{label}) WHERE exists(n.{prop}) RETURN n"
-                parameters = {}
+                cypher_query = "MATCH (n) WHERE $label IN labels(n) AND n[$prop] IS NOT NULL RETURN n"
+                parameters = {"label": label, "prop": prop}
         else:
             return jsonify({"error": "Missing 'cypher' or 'label' and 'property' fields in JSON"}), 400
 
-        result = neo4j_client.query_graph(cypher_query, parameters)
-        return jsonify({"result": result, "count": len(result)}), 200
+        records = neo4j_client.query_graph(cypher_query, parameters)
+        # Pull the first record eagerly so query errors still produce a JSON
+        # 500 instead of surfacing mid-stream.
+        first = next(records, None)
+        return Response(
+            stream_with_context(_stream_query_json(first, records)),
+            mimetype='application/json'
+        )
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
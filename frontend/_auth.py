@@ -0,0 +1,103 @@
+"""Google OAuth helpers shared by the Streamlit frontend.
+
+Factored out of app.py so the login/token-exchange logic lives in one
+module instead of being redefined by every frontend script Streamlit
+reruns.
+"""
+
+import functools
+import json
+import os
+from pathlib import Path
+
+import requests
+import streamlit as st
+from google_auth_oauthlib.flow import Flow
+from google.oauth2 import id_token
+from google.auth.transport import requests as grequests
+
+CLIENT_SECRETS_FILE = Path(__file__).parent.joinpath("agentverse-streamlit-app", "client_secrets.json")
+
+SCOPES = [
+	"openid",
+	"https://www.googleapis.com/auth/userinfo.email",
+	"https://www.googleapis.com/auth/userinfo.profile",
+]
+
+# One transport shared across ID-token verifications: the cert fetch from
+# Google rides a kept-alive session instead of opening a fresh connection
+# (TLS handshake included) on every login.
+_CERTS_SESSION = requests.Session()
+_GOOGLE_REQUEST = grequests.Request(session=_CERTS_SESSION)
+
+
+@functools.lru_cache(maxsize=1)
+def _client_config(client_id, client_secret, redirect_uri):
+	if client_id and client_secret:
+		return {
+			"web": {
+				"client_id": client_id,
+				"client_secret": client_secret,
+				"redirect_uris": [redirect_uri],
+				"auth_uri": "https://accounts.google.com/o/oauth2/auth",
+				"token_uri": "https://oauth2.googleapis.com/token",
+			}
+		}
+
+	# # Fallback to reading the client_secrets.json file (for compatibility).
+
+	if CLIENT_SECRETS_FILE.exists():
+		try:
+			return json.loads(CLIENT_SECRETS_FILE.read_text(encoding="utf-8"))
+		except Exception:
+			return None
+	return None
+
+
+def load_client_config():
+	# First, allow configuration via environment variables so secrets are not
+	# stored in the repository. Set these in your shell or use a secret manager:
+	#   GOOGLE_OAUTH_CLIENT_ID, GOOGLE_OAUTH_CLIENT_SECRET, GOOGLE_OAUTH_REDIRECT_URI
+	# The env lookups stay dynamic (they form the cache key); the file read
+	# and JSON parse happen once per credential set instead of per rerun.
+	return _client_config(
+		os.environ.get("GOOGLE_OAUTH_CLIENT_ID") or os.environ.get("CLIENT_ID"),
+		os.environ.get("GOOGLE_OAUTH_CLIENT_SECRET") or os.environ.get("CLIENT_SECRET"),
+		os.environ.get("GOOGLE_OAUTH_REDIRECT_URI") or "http://localhost:8501/",
+	)
+
+
+def login_flow():
+	client_config = load_client_config()
+	if not client_config:
+		st.error("Google client_secrets.json not found in frontend/agentverse-streamlit-app/. Please add it.")
+		return None
+
+	flow = Flow.from_client_config(client_config, scopes=SCOPES, redirect_uri="http://localhost:8501/")
+	auth_url, state = flow.authorization_url(prompt="consent", include_granted_scopes="true", access_type="offline")
+	try:
+		st.session_state["oauth_state"] = state
+	except Exception:
+		pass
+	return auth_url, state
+
+
+def exchange_code_for_user(code: str, state: str):
+	client_config = load_client_config()
+	flow = Flow.from_client_config(client_config, scopes=SCOPES, state=state, redirect_uri="http://localhost:8501/")
+	flow.fetch_token(code=code)
+	credentials = flow.credentials
+	# verify id token and extract user info
+	idinfo = id_token.verify_oauth2_token(credentials.id_token, _GOOGLE_REQUEST, client_config["web"]["client_id"])
+	return {"name": idinfo.get("name"), "email": idinfo.get("email")}
+
+
+def _rerun_compat():
+	"""Try to programmatically rerun the Streamlit script in a version-compatible way."""
+	try:
+		st.rerun()
+	except AttributeError:
+		try:
+			st.experimental_rerun()
+		except Exception:
+			st.warning("Please refresh the page manually.")
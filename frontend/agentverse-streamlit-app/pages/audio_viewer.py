@@ -4,150 +4,435 @@ import sys
 from pathlib import Path
 import threading
 import os
-import psutil
+import signal
 from dotenv import load_dotenv
 import time
 import pygame
 import json
+from html import escape
+
+try:
+    from watchfiles import Change, watch as watch_dir
+except ImportError:  # optional; the monitor falls back to directory polling
+    watch_dir = None
+
+try:
+    import orjson
+except ImportError:  # optional dependency, stdlib fallback
+    orjson = None
+
+# Rust-backed parse for transcript JSON when available; both accept bytes
+# and both raise ValueError subclasses on bad input.
+_loads = orjson.loads if orjson is not None else json.loads
 
 load_dotenv()
 
+# Read once at import; every render referenced os.getenv before.
+AGENT_NAME = os.getenv("AGENT_NAME", "C8")
+
 AUDIO_AGENT_PATH = Path(__file__).parent.parent.parent.parent.joinpath("agents/transcribe/", "audio_agent.py").resolve()
 AUDIO_RESPONSES_DIR = Path(__file__).parent.parent.parent.parent.joinpath("agents/live_chating/audio_responses/").resolve()
 OUTPUT_JSON = Path(__file__).parent.parent.parent / "transcripts_dataset.json"
+AGENT_LOG_PATH = Path(__file__).parent.parent.parent / "audio_agent.log"
 
 # Ensure audio responses directory exists
 if not AUDIO_RESPONSES_DIR.exists():
     AUDIO_RESPONSES_DIR.mkdir(parents=True, exist_ok=True)
 
-def kill_process_tree(pid):
-    """Kill a process and all its children"""
+# The UI renders at most 100 messages, so the transcript reader keeps only a
+# bounded tail: cold loads of a large JSONL file seek into the last ~64KiB
+# instead of parsing from byte zero, and the parsed cache is trimmed to a
+# fixed window so memory stays flat over a long session.
+_TAIL_WINDOW_BYTES = 64 * 1024
+_MAX_CACHED_MESSAGES = 500
+
+# Message markup is built as one string and emitted through a single
+# st.markdown call, so showing 100 messages costs one component round-trip
+# instead of 100. Templates and CSS are module constants.
+_TRANSCRIPT_CSS = """
+<style>
+.message-container {
+    margin: 12px 0;
+    padding: 16px;
+    border-radius: 12px;
+    animation: fadeIn 0.3s;
+}
+.agent-message {
+    background: linear-gradient(135deg, #1e3a5f 0%, #2c5282 100%);
+    border-left: 4px solid #4ECDC4;
+    box-shadow: 0 2px 8px rgba(78, 205, 196, 0.2);
+}
+.user-message {
+    background: linear-gradient(135deg, #2d2d2d 0%, #3a3a3a 100%);
+    border-left: 4px solid #FF6B6B;
+    box-shadow: 0 2px 8px rgba(255, 107, 107, 0.2);
+}
+.speaker-name {
+    font-weight: 600;
+    font-size: 14px;
+    margin-bottom: 8px;
+    display: flex;
+    align-items: center;
+    gap: 8px;
+}
+.agent-speaker {
+    color: #4ECDC4;
+}
+.user-speaker {
+    color: #FF6B6B;
+}
+.message-text {
+    color: #e8e8e8;
+    font-size: 15px;
+    line-height: 1.6;
+    word-wrap: break-word;
+}
+.speaker-icon {
+    font-size: 18px;
+}
+@keyframes fadeIn {
+    from { opacity: 0; transform: translateY(10px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+.empty-state {
+    text-align: center;
+    padding: 60px 20px;
+    color: #888;
+}
+.empty-state-icon {
+    font-size: 64px;
+    margin-bottom: 16px;
+}
+</style>
+"""
+
+_EMPTY_STATE_HTML = """
+<div class="empty-state">
+    <div class="empty-state-icon">💭</div>
+    <h3>No messages yet</h3>
+    <p>Start the audio transcription to see the conversation appear here.</p>
+</div>
+"""
+
+_AGENT_MSG_TEMPLATE = """
+<div class="message-container agent-message">
+    <div class="speaker-name agent-speaker">
+        <span class="speaker-icon">🤖</span>
+        <span>{speaker}</span>
+    </div>
+    <div class="message-text">{text}</div>
+</div>
+"""
+
+_USER_MSG_TEMPLATE = """
+<div class="message-container user-message">
+    <div class="speaker-name user-speaker">
+        <span class="speaker-icon">👤</span>
+        <span>{speaker}</span>
+    </div>
+    <div class="message-text">{text}</div>
+</div>
+"""
+
+def kill_process_tree(process):
+    """Terminate the agent's whole process group with a single signal.
+
+    The subprocess is started in its own session (start_new_session) /
+    process group (CREATE_NEW_PROCESS_GROUP), so one group signal reaches
+    every child without walking /proc per PID.
+    """
     try:
-        parent = psutil.Process(pid)
-        children = parent.children(recursive=True)
-        
-        for child in children:
-            try:
-                child.terminate()
-            except psutil.NoSuchProcess:
-                pass
-        
+        if sys.platform == 'win32':
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(os.getpgid(process.pid), signal.SIGTERM)
         try:
-            parent.terminate()
-        except psutil.NoSuchProcess:
-            pass
-        
-        gone, alive = psutil.wait_procs(children + [parent], timeout=3)
-        
-        for p in alive:
-            try:
-                p.kill()
-            except psutil.NoSuchProcess:
-                pass
-                
-    except psutil.NoSuchProcess:
+            process.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            if sys.platform == 'win32':
+                process.kill()
+            else:
+                os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+    except ProcessLookupError:
         pass
     except Exception as exc:
         st.warning(f"Error killing process tree: {exc}")
 
-def monitor_and_play_audio(stop_event):
-    """Monitor audio responses directory and play new files automatically"""
+def _wait_until_stable(audio_file, stop_event):
+    """Return once two consecutive size checks agree (bounded at ~400ms).
+
+    The TTS producer publishes files via atomic rename, so they are
+    normally complete on arrival and this returns after one 50ms check;
+    it only matters for writers that write the file in place.
+    """
     try:
-        # Initialize pygame mixer in this thread
-        pygame.mixer.quit()  # Quit any existing mixer
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-        print(f"Audio monitor started. Watching: {AUDIO_RESPONSES_DIR}")
+        size = audio_file.stat().st_size
+        for _ in range(8):
+            if stop_event.wait(0.05):
+                return
+            new_size = audio_file.stat().st_size
+            if new_size == size:
+                return
+            size = new_size
+    except OSError:
+        pass
+
+def _play_audio_file(audio_file, stop_event):
+    """Play a single response file to completion, then delete it."""
+    try:
+        print(f"Playing audio: {audio_file}")
+
+        # Ensure file is fully written
+        _wait_until_stable(audio_file, stop_event)
+
+        # Load and play the audio file
+        pygame.mixer.music.load(str(audio_file))
+        pygame.mixer.music.play()
+
+        # Wait for playback to finish. Event.wait is a timed, interruptible
+        # sleep: one wakeup per 250ms instead of Clock().tick's 10 per
+        # second, and it returns immediately when Stop is clicked.
+        while pygame.mixer.music.get_busy():
+            if stop_event.wait(0.25):
+                break
+
+        print(f"Finished playing: {audio_file}")
+
+        # Small delay before deletion
+        time.sleep(0.1)
+
+        # Delete the file after playing
+        audio_file.unlink()
+        print(f"Deleted: {audio_file}")
+
     except Exception as e:
-        print(f"Failed to initialize pygame mixer: {e}")
-        return
-    
+        print(f"Error playing {audio_file}: {e}")
+
+def _watch_for_audio(stop_event):
+    """Discover new response files via kernel filesystem notifications.
+
+    watchfiles blocks in inotify/FSEvents/ReadDirectoryChangesW until
+    something actually changes, so the thread costs nothing while idle and
+    picks up new files in milliseconds instead of a 300ms poll interval.
+    The TTS producer publishes files with an atomic rename, so an "added"
+    event means the file is complete.
+    """
+    for changes in watch_dir(AUDIO_RESPONSES_DIR, stop_event=stop_event):
+        new_files = sorted(
+            {
+                Path(raw_path)
+                for change, raw_path in changes
+                if change != Change.deleted and raw_path.endswith(".mp3")
+            },
+            key=lambda f: f.stat().st_mtime if f.exists() else 0,
+        )
+        for audio_file in new_files:
+            if stop_event.is_set():
+                return
+            # Our own post-playback unlink also surfaces here; skip gone files.
+            if audio_file.exists():
+                _play_audio_file(audio_file, stop_event)
+
+def _poll_for_audio(stop_event):
+    """Fallback discovery loop for environments without watchfiles."""
     # Track files we've already seen
     seen_files = set(AUDIO_RESPONSES_DIR.glob("*.mp3"))
     print(f"Initial files seen: {len(seen_files)}")
-    
+
     while not stop_event.is_set():
         try:
             # Get current files
             current_files = set(AUDIO_RESPONSES_DIR.glob("*.mp3"))
-            
+
             # Find new files
             new_files = current_files - seen_files
-            
+
             if new_files:
                 print(f"Found {len(new_files)} new audio file(s)")
                 # Sort by modification time and play the newest
                 for audio_file in sorted(new_files, key=lambda f: f.stat().st_mtime):
-                    try:
-                        print(f"Playing audio: {audio_file}")
-                        
-                        # Ensure file is fully written (wait a bit)
-                        time.sleep(0.2)
-                        
-                        # Load and play the audio file
-                        pygame.mixer.music.load(str(audio_file))
-                        pygame.mixer.music.play()
-                        
-                        # Wait for playback to finish
-                        while pygame.mixer.music.get_busy() and not stop_event.is_set():
-                            pygame.time.Clock().tick(10)
-                        
-                        print(f"Finished playing: {audio_file}")
-                        
-                        # Small delay before deletion
-                        time.sleep(0.1)
-                        
-                        # Delete the file after playing
-                        audio_file.unlink()
-                        print(f"Deleted: {audio_file}")
-                        
-                    except Exception as e:
-                        print(f"Error playing {audio_file}: {e}")
-                        # Still remove from seen files even if play failed
-                
+                    _play_audio_file(audio_file, stop_event)
+
                 # Update seen files
                 seen_files = set(AUDIO_RESPONSES_DIR.glob("*.mp3"))
-            
-            time.sleep(0.3)  # Check every 300ms
-            
+
+            # Event-aware sleep: returns immediately when Stop is clicked
+            # instead of finishing the 300ms nap first.
+            if stop_event.wait(0.3):
+                break
+
         except Exception as exc:
             print(f"Monitor error: {exc}")
-            time.sleep(1)
-    
-    # Cleanup
+            if stop_event.wait(1):
+                break
+
+def _ensure_mixer():
+    """Initialize the pygame mixer once per process and keep it alive.
+
+    Re-opening the audio device on every Start click costs hundreds of
+    milliseconds and can race a previous stream that has not released the
+    device yet; subsequent monitor starts reuse the live mixer. 44.1kHz
+    matches the TTS mp3s so SDL skips resampling, and a 1024-sample buffer
+    stays above the underrun threshold that made 512 stall the mixer.
+    """
+    if pygame.mixer.get_init():
+        return
+    pygame.mixer.init(
+        frequency=int(os.getenv("AUDIO_FREQ", "44100")),
+        size=-16,
+        channels=2,
+        buffer=int(os.getenv("AUDIO_BUFFER", "1024"))
+    )
+
+def monitor_and_play_audio(stop_event):
+    """Monitor audio responses directory and play new files automatically"""
     try:
-        pygame.mixer.quit()
+        _ensure_mixer()
+        print(f"Audio monitor started. Watching: {AUDIO_RESPONSES_DIR}")
+    except Exception as e:
+        print(f"Failed to initialize pygame mixer: {e}")
+        return
+
+    try:
+        if watch_dir is not None:
+            _watch_for_audio(stop_event)
+        else:
+            _poll_for_audio(stop_event)
+    except Exception as exc:
+        print(f"Monitor error: {exc}")
+
+    # Cleanup: stop playback but leave the mixer initialized so the next
+    # Start click does not pay the device re-open cost.
+    try:
+        pygame.mixer.music.stop()
         print("Audio monitor stopped")
     except:
         pass
 
+def _prep_entry(entry):
+    """Pre-escape display fields when an entry enters a cache.
+
+    Escaping happens once per entry for the lifetime of the cache instead
+    of once per entry per render; the render loop uses the _html_* fields
+    directly.
+    """
+    entry["_html_speaker"] = escape(entry.get("speaker", "Unknown"))
+    entry["_html_text"] = escape(entry.get("transcript", ""))
+    return entry
+
+def read_transcript_pipe(process, transcripts):
+    """Stream JSONL transcripts from the agent's stdout into shared state.
+
+    Appends to the plain list object held in session state, so the UI sees
+    new utterances at pipe latency instead of the file-poll interval.
+    """
+    try:
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                transcripts.append(_prep_entry(_loads(line)))
+            except ValueError:
+                continue
+    except Exception as exc:
+        print(f"Pipe reader error: {exc}")
+
+def merge_transcripts(file_entries, pipe_entries):
+    """Overlay freshly piped entries that have not reached the dataset file yet.
+
+    The dataset file stays canonical (it also carries the live-chat agent's
+    replies); the stdout pipe just closes the write-latency gap for the
+    newest utterances.
+    """
+    if not pipe_entries:
+        return file_entries
+    seen = {(e.get("speaker"), e.get("transcript")) for e in file_entries}
+    extra = [
+        e for e in pipe_entries[-20:]
+        if (e.get("speaker"), e.get("transcript")) not in seen
+    ]
+    return file_entries + extra
+
 def load_transcripts():
-    """Load transcripts from the dataset JSON file"""
-    # Try to resolve the absolute path
+    """Load transcripts from the dataset file.
+
+    The live file is JSONL, so each call reads and parses only the bytes
+    past the last-seen offset (kept in session state with the parsed
+    history); appends cost O(new lines) instead of re-parsing the file.
+    A finalized JSON-array file (written at agent exit) is parsed whole.
+    """
     transcript_path = OUTPUT_JSON.resolve()
-    
-    print(f"DEBUG: Looking for transcripts at: {transcript_path}")
-    print(f"DEBUG: File exists: {transcript_path.exists()}")
-    
     if not transcript_path.exists():
-        print("DEBUG: Transcript file does not exist yet")
         return []
-    
+
+    cache = st.session_state.setdefault(
+        "transcript_reader", {"offset": 0, "entries": []}
+    )
     try:
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            print(f"DEBUG: File content length: {len(content)} bytes")
-            if not content.strip():
-                print("DEBUG: File is empty")
-                return []
-            data = json.loads(content)
-            print(f"DEBUG: Loaded {len(data) if isinstance(data, list) else 0} transcripts")
-            return data if isinstance(data, list) else []
-    except json.JSONDecodeError as e:
-        print(f"DEBUG: JSON decode error: {e}")
-        return []
-    except IOError as e:
-        print(f"DEBUG: IO error: {e}")
-        return []
+        stat = transcript_path.stat()
+        size = stat.st_size
+        sig = (size, stat.st_mtime_ns)
+        if size == 0:
+            cache["offset"] = 0
+            cache["entries"] = []
+            return []
+        if sig == cache.get("sig"):
+            # Unchanged since the last parse (same size and mtime); serve the
+            # memoized list without even opening the file, so slider drags
+            # and filter changes cost a single stat().
+            return cache["entries"]
+
+        with open(transcript_path, 'rb') as f:
+            if f.read(1) == b'[':
+                # Finalized array form; only appears after a session ends.
+                f.seek(0)
+                try:
+                    data = _loads(f.read())
+                except ValueError:
+                    return cache["entries"]
+                cache["offset"] = size
+                cache["entries"] = (
+                    [_prep_entry(e) for e in data] if isinstance(data, list) else []
+                )
+                cache["sig"] = sig
+                return cache["entries"]
+
+            if size < cache["offset"]:
+                # File was truncated or rewritten; start over.
+                cache["offset"] = 0
+                cache["entries"] = []
+            if cache["offset"] == 0 and size > _TAIL_WINDOW_BYTES:
+                # Cold load of a large file: only the rendered tail matters,
+                # so skip straight to it and discard the partial first line.
+                f.seek(size - _TAIL_WINDOW_BYTES)
+                skipped = f.readline()
+                cache["offset"] = size - _TAIL_WINDOW_BYTES + len(skipped)
+            f.seek(cache["offset"])
+            chunk = f.read()
+
+        # Only complete lines are parsed; a half-written tail waits for the
+        # next call.
+        last_nl = chunk.rfind(b'\n')
+        if last_nl == -1:
+            return cache["entries"]
+        for line in chunk[:last_nl].split(b'\n'):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                cache["entries"].append(_prep_entry(_loads(line)))
+            except ValueError:
+                continue
+        cache["offset"] += last_nl + 1
+        cache["sig"] = sig
+        entries = cache["entries"]
+        if len(entries) > _MAX_CACHED_MESSAGES:
+            del entries[:len(entries) - _MAX_CACHED_MESSAGES]
+        return entries
+    except OSError as e:
+        print(f"Transcript read error: {e}")
+        return cache["entries"]
 
 def display_transcript_ui():
     """Display transcripts in a nice UI"""
@@ -176,8 +461,10 @@ def display_transcript_ui():
             except Exception as e:
                 st.error(f"Failed to clear: {e}")
     
-    # Load and filter transcripts
-    transcripts = load_transcripts()
+    # Load and filter transcripts (file history + freshly piped entries)
+    transcripts = merge_transcripts(
+        load_transcripts(), st.session_state.get("pipe_transcripts", [])
+    )
     
     # Debug info
     if transcripts:
@@ -185,118 +472,48 @@ def display_transcript_ui():
     else:
         st.caption(f"⚠️ No transcripts found in file")
     
-    agent_name = os.getenv("AGENT_NAME", "C8")
-    
-    if filter_option == "Agent (C8) Only":
-        transcripts = [t for t in transcripts if t.get("speaker") == agent_name]
-    elif filter_option == "Users Only":
-        transcripts = [t for t in transcripts if t.get("speaker") != agent_name]
-    
-    # Limit messages
-    transcripts = transcripts[-max_messages:]
+    # Filter and window in one pass; the unfiltered case just slices, so the
+    # common path never scans the whole history.
+    if filter_option == "All Messages":
+        transcripts = transcripts[-max_messages:]
+    else:
+        if filter_option == "Agent (C8) Only":
+            pred = lambda t: t.get("speaker") == AGENT_NAME
+        else:
+            pred = lambda t: t.get("speaker") != AGENT_NAME
+        transcripts = [t for t in transcripts if pred(t)][-max_messages:]
     
     # Display count
     st.caption(f"📊 Showing {len(transcripts)} message(s)")
     
-    # Custom CSS for better styling
-    st.markdown("""
-    <style>
-    .message-container {
-        margin: 12px 0;
-        padding: 16px;
-        border-radius: 12px;
-        animation: fadeIn 0.3s;
-    }
-    .agent-message {
-        background: linear-gradient(135deg, #1e3a5f 0%, #2c5282 100%);
-        border-left: 4px solid #4ECDC4;
-        box-shadow: 0 2px 8px rgba(78, 205, 196, 0.2);
-    }
-    .user-message {
-        background: linear-gradient(135deg, #2d2d2d 0%, #3a3a3a 100%);
-        border-left: 4px solid #FF6B6B;
-        box-shadow: 0 2px 8px rgba(255, 107, 107, 0.2);
-    }
-    .speaker-name {
-        font-weight: 600;
-        font-size: 14px;
-        margin-bottom: 8px;
-        display: flex;
-        align-items: center;
-        gap: 8px;
-    }
-    .agent-speaker {
-        color: #4ECDC4;
-    }
-    .user-speaker {
-        color: #FF6B6B;
-    }
-    .message-text {
-        color: #e8e8e8;
-        font-size: 15px;
-        line-height: 1.6;
-        word-wrap: break-word;
-    }
-    .speaker-icon {
-        font-size: 18px;
-    }
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(10px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    .empty-state {
-        text-align: center;
-        padding: 60px 20px;
-        color: #888;
-    }
-    .empty-state-icon {
-        font-size: 64px;
-        margin-bottom: 16px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
+    # Custom CSS for better styling (module constant, emitted once per run)
+    st.markdown(_TRANSCRIPT_CSS, unsafe_allow_html=True)
+
     # Display transcripts
     if not transcripts:
-        st.markdown("""
-        <div class="empty-state">
-            <div class="empty-state-icon">💭</div>
-            <h3>No messages yet</h3>
-            <p>Start the audio transcription to see the conversation appear here.</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_EMPTY_STATE_HTML, unsafe_allow_html=True)
     else:
-        # Create a container with max height and scrolling
-        with st.container():
-            for idx, entry in enumerate(reversed(transcripts)):
-                speaker = entry.get("speaker", "Unknown")
-                transcript = entry.get("transcript", "")
-                
-                # Escape HTML in transcript text
-                transcript = transcript.replace("<", "&lt;").replace(">", "&gt;")
-                
-                is_agent = speaker == agent_name
-                
-                if is_agent:
-                    st.markdown(f"""
-                    <div class="message-container agent-message">
-                        <div class="speaker-name agent-speaker">
-                            <span class="speaker-icon">🤖</span>
-                            <span>{speaker}</span>
-                        </div>
-                        <div class="message-text">{transcript}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="message-container user-message">
-                        <div class="speaker-name user-speaker">
-                            <span class="speaker-icon">👤</span>
-                            <span>{speaker}</span>
-                        </div>
-                        <div class="message-text">{transcript}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+        # Build the whole conversation as one HTML string so Streamlit ships
+        # a single component message instead of one per transcript entry.
+        parts = []
+        for entry in reversed(transcripts):
+            speaker = entry.get("speaker", "Unknown")
+            template = _AGENT_MSG_TEMPLATE if speaker == AGENT_NAME else _USER_MSG_TEMPLATE
+            # _html_* fields are pre-escaped at ingest; escape here only for
+            # entries that arrived through some other path.
+            parts.append(template.format(
+                speaker=entry.get("_html_speaker") or escape(speaker),
+                text=entry.get("_html_text") or escape(entry.get("transcript", ""))
+            ))
+        st.markdown("".join(parts), unsafe_allow_html=True)
+
+if hasattr(st, "fragment"):
+    # Partial rerun (Streamlit 1.37+): only the transcript panel re-executes
+    # every 2s; the controls, process state and the rest of the page are
+    # untouched, and no script-runner thread sits in time.sleep.
+    _transcript_fragment = st.fragment(run_every=2)(display_transcript_ui)
+else:
+    _transcript_fragment = None
 
 def main():
     """Main function to display Audio Agent interface"""
@@ -318,6 +535,10 @@ def main():
         st.session_state.monitor_thread = None
     if "stop_event" not in st.session_state:
         st.session_state.stop_event = None
+    if "pipe_transcripts" not in st.session_state:
+        st.session_state.pipe_transcripts = []
+    if "audio_log_file" not in st.session_state:
+        st.session_state.audio_log_file = None
     
     # Start/Stop Audio Transcription Button
     st.header("🎙️ Transcription Control")
@@ -331,20 +552,36 @@ def main():
                     # Ensure audio responses directory exists
                     AUDIO_RESPONSES_DIR.mkdir(parents=True, exist_ok=True)
                     
-                    # Start audio agent as subprocess
+                    # Start audio agent as subprocess; stdout is the JSONL
+                    # transcript pipe, line-buffered for low latency. stderr
+                    # goes to a log file — nothing drains a stderr pipe, and
+                    # a full pipe buffer would eventually block the agent.
+                    log_file = open(AGENT_LOG_PATH, "ab")
                     process = subprocess.Popen(
                         [sys.executable, str(AUDIO_AGENT_PATH)],
                         stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        preexec_fn=os.setsid if sys.platform != 'win32' else None,
+                        stderr=log_file,
+                        bufsize=1,
+                        text=True,
+                        start_new_session=sys.platform != 'win32',
                         creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if sys.platform == 'win32' else 0
                     )
                     st.session_state.audio_process = process
+                    st.session_state.audio_log_file = log_file
                     st.session_state.transcription_running = True
-                    
+
                     # Create stop event for thread communication
                     stop_event = threading.Event()
                     st.session_state.stop_event = stop_event
+
+                    # Stream transcripts off the agent's stdout pipe
+                    st.session_state.pipe_transcripts = []
+                    pipe_thread = threading.Thread(
+                        target=read_transcript_pipe,
+                        args=(process, st.session_state.pipe_transcripts),
+                        daemon=True
+                    )
+                    pipe_thread.start()
                     
                     # Give process a moment to start
                     time.sleep(0.5)
@@ -370,8 +607,7 @@ def main():
                 
                 if st.session_state.audio_process:
                     try:
-                        pid = st.session_state.audio_process.pid
-                        kill_process_tree(pid)
+                        kill_process_tree(st.session_state.audio_process)
                         st.session_state.audio_process = None
                     except Exception as exc:
                         st.warning(f"Error stopping process: {exc}")
@@ -382,6 +618,13 @@ def main():
                         except:
                             pass
                 
+                if st.session_state.audio_log_file:
+                    try:
+                        st.session_state.audio_log_file.close()
+                    except OSError:
+                        pass
+                    st.session_state.audio_log_file = None
+
                 st.session_state.transcription_running = False
                 st.session_state.monitor_thread = None
                 st.session_state.stop_event = None
@@ -390,13 +633,15 @@ def main():
     
     st.divider()
     
-    # Display transcripts
-    display_transcript_ui()
-    
-    # Auto-refresh when transcription is running
-    if st.session_state.transcription_running:
-        time.sleep(2)
-        st.rerun()
+    # Display transcripts; the fragment refreshes itself every 2s. Older
+    # Streamlit falls back to the full-page sleep+rerun loop.
+    if _transcript_fragment is not None:
+        _transcript_fragment()
+    else:
+        display_transcript_ui()
+        if st.session_state.transcription_running:
+            time.sleep(2)
+            st.rerun()
 
 if __name__ == "__main__":
     main()
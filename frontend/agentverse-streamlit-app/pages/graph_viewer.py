@@ -1,3 +1,4 @@
+import atexit
 import streamlit as st
 from neo4j import GraphDatabase
 from pyvis.network import Network
@@ -7,33 +8,77 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Connection settings read once at import instead of per rerun.
+NEO4J_URI = os.getenv("NEO4J_URI", "")
+NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "")
+
+
+@st.cache_resource
+def get_driver(uri, user, password):
+    """One Bolt driver per server process, shared across reruns.
+
+    Every slider move reruns the script; reusing the driver keeps the
+    connection pool warm instead of paying a TCP/TLS/Bolt handshake per
+    interaction. Closed at interpreter exit rather than per rerun.
+    """
+    driver = GraphDatabase.driver(
+        uri,
+        auth=(user, password),
+        max_connection_pool_size=10,
+        connection_acquisition_timeout=5,
+    )
+    atexit.register(driver.close)
+    return driver
+
+
 class Neo4jGraphViewer:
-    def __init__(self, uri, user, password):
-        """Initialize Neo4j connection"""
-        try:
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))
-            self.connected = True
-        except Exception as e:
-            st.error(f"Failed to connect to Neo4j: {str(e)}")
-            self.connected = False
-    
-    def close(self):
-        """Close the connection"""
-        if hasattr(self, 'driver'):
-            self.driver.close()
-    
+    def __init__(self, driver):
+        """Wrap an existing (shared) Neo4j driver"""
+        self.driver = driver
+        self.connected = driver is not None
+
+
     def get_all_relationships(self, limit=200):
-        """Fetch all relationships from the graph"""
+        """Fetch relationships projected down to the fields the renderer uses.
+
+        Returning ids, first labels, property maps and relationship types
+        (rather than whole node/relationship objects) keeps the wire payload
+        and driver parse time proportional to what actually gets drawn. The
+        limit is a bound parameter so the server reuses one query plan.
+        """
         if not self.connected:
             return []
-        
+
+        query = (
+            "MATCH (n)-[r]->(m) "
+            "RETURN coalesce(n.id, elementId(n)) AS sid, labels(n)[0] AS slabel, "
+            "properties(n) AS sprops, type(r) AS rtype, "
+            "coalesce(m.id, elementId(m)) AS tid, labels(m)[0] AS tlabel, "
+            "properties(m) AS tprops "
+            "LIMIT $limit"
+        )
         with self.driver.session() as session:
-            result = session.run(f"""
-                MATCH (n)-[r]->(m)
-                RETURN n, r, m
-                LIMIT {limit}
-            """)
-            return [(record["n"], record["r"], record["m"]) for record in result]
+            return session.execute_read(
+                lambda tx: [record.data() for record in tx.run(query, limit=limit)]
+            )
+
+def _tooltip(props):
+    """Build the hover text from a property map with a generator join."""
+    return "\n".join(f"{k}: {v}" for k, v in props.items())
+
+def _add_node(net, added_nodes, colors, node_id, label, props):
+    """Add a node once; repeat appearances across relationships are free."""
+    if node_id in added_nodes:
+        return
+    net.add_node(
+        node_id,
+        label=props.get("name", node_id),
+        title=_tooltip(props),
+        color=colors.get(label, "#95A5A6"),
+        size=25
+    )
+    added_nodes.add(node_id)
 
 def create_graph_visualization(relationships):
     """Create an interactive network graph using PyVis"""
@@ -67,66 +112,47 @@ def create_graph_visualization(relationships):
     }
     
     added_nodes = set()
-    
-    for source_node, relationship, target_node in relationships:
-        # Add source node
-        source_id = source_node.get("id", str(id(source_node)))
-        if source_id not in added_nodes:
-            label = list(source_node.labels)[0] if source_node.labels else "Unknown"
-            tooltip = "\n".join([f"{k}: {v}" for k, v in dict(source_node).items()])
-            net.add_node(
-                source_id,
-                label=source_node.get("name", source_id),
-                title=tooltip,
-                color=colors.get(label, "#95A5A6"),
-                size=25
-            )
-            added_nodes.add(source_id)
-        
-        # Add target node
-        target_id = target_node.get("id", str(id(target_node)))
-        if target_id not in added_nodes:
-            label = list(target_node.labels)[0] if target_node.labels else "Unknown"
-            tooltip = "\n".join([f"{k}: {v}" for k, v in dict(target_node).items()])
-            net.add_node(
-                target_id,
-                label=target_node.get("name", target_id),
-                title=tooltip,
-                color=colors.get(label, "#95A5A6"),
-                size=25
-            )
-            added_nodes.add(target_id)
-        
-        # Add relationship
-        edge_tooltip = f"{relationship.type}"
-        net.add_edge(source_id, target_id, title=edge_tooltip, label=relationship.type)
-    
+
+    for record in relationships:
+        _add_node(net, added_nodes, colors, record["sid"], record["slabel"], record["sprops"])
+        _add_node(net, added_nodes, colors, record["tid"], record["tlabel"], record["tprops"])
+        net.add_edge(record["sid"], record["tid"], title=record["rtype"], label=record["rtype"])
+
     return net.generate_html()
 
+@st.cache_data(ttl=30, show_spinner=False)
+def build_graph_html(limit: int):
+    """Query Neo4j and render the PyVis HTML, memoized per limit.
+
+    Reruns that keep the slider at the same value (any other widget
+    interaction) serve the cached page instantly; the 30s TTL bounds how
+    stale the rendering can get after graph edits.
+    """
+    viewer = Neo4jGraphViewer(get_driver(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD))
+    relationships = viewer.get_all_relationships(limit=limit)
+    if not relationships:
+        return None, 0
+    return create_graph_visualization(relationships), len(relationships)
+
+
 def main():
     """Main function to display Neo4j graph"""
     st.title("🕸️ Knowledge Graph")
-    
-    # Use environment variables for connection
-    uri = os.getenv("NEO4J_URI", "")
-    user = os.getenv("NEO4J_USER", "neo4j")
-    password = os.getenv("NEO4J_PASSWORD", "")
-    
+
     limit = st.slider("Max nodes to display", 50, 500, 200)
-    
-    viewer = Neo4jGraphViewer(uri, user, password)
-    if viewer.connected:
+
+    try:
         with st.spinner("Loading graph..."):
-            relationships = viewer.get_all_relationships(limit=limit)
-        
-        if relationships:
-            html = create_graph_visualization(relationships)
-            components.html(html, height=800, scrolling=False)
-            st.info(f"Displaying {len(relationships)} relationships")
-        else:
-            st.warning("No data found in the graph")
+            html, count = build_graph_html(limit)
+    except Exception as e:
+        st.error(f"Could not load graph from Neo4j: {str(e)}. Check your .env file and Neo4j server.")
+        return
+
+    if html:
+        components.html(html, height=800, scrolling=False)
+        st.info(f"Displaying {count} relationships")
     else:
-        st.error("Could not connect to Neo4j. Check your .env file and Neo4j server.")
+        st.warning("No data found in the graph")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,5 +1,14 @@
+import functools
+
 from google import genai
 
+try:
+    import streamlit as st
+    _cache = st.cache_resource
+except ImportError:  # non-Streamlit callers still get a process-wide cache
+    _cache = functools.lru_cache(maxsize=1)
+
+
 class GenAIClient:
     def __init__(self, api_key):
         self.client = genai.Client(api_key=api_key)
@@ -9,4 +18,24 @@ class GenAIClient:
             model="gemini-2.5-flash",
             contents=prompt,
         )
-        return response.text
\ No newline at end of file
+        return response.text
+
+    def generate_content_stream(self, prompt):
+        """Return an iterator of response chunks as the model produces them,
+        so callers can show text at first-chunk latency instead of waiting
+        for the full response."""
+        return self.client.models.generate_content_stream(
+            model="gemini-2.5-flash",
+            contents=prompt,
+        )
+
+
+@_cache
+def get_client(api_key: str) -> GenAIClient:
+    """Return the shared client for this api_key.
+
+    Constructing genai.Client opens an HTTP connection pool; caching the
+    instance (per Streamlit server, or via lru_cache outside Streamlit)
+    means only the first call pays TLS and pool setup.
+    """
+    return GenAIClient(api_key)
\ No newline at end of file
@@ -1,6 +1,8 @@
+import collections
+import itertools
+import io
 import os
 import json
-import subprocess
 import sys
 from pathlib import Path
 import importlib.util
@@ -8,90 +10,79 @@ from dotenv import load_dotenv
 import streamlit as st
 
 
-from PyPDF2 import PdfReader
-from docx import Document
-
-from google_auth_oauthlib.flow import Flow
-from google.oauth2 import id_token
-from google.auth.transport import requests as grequests
+from _auth import load_client_config, login_flow, exchange_code_for_user, _rerun_compat
 
 load_dotenv()
 
 # Paths and config
 HERE = Path(__file__).parent
-AGENTS_TEXT_AGENT = Path(__file__).parent.joinpath("..", "agents", "text_agent.py").resolve()
-OUTPUT_JSON = Path("text_agent_output.json")
 GRAPH_VIEWER_PATH = HERE.joinpath("agentverse-streamlit-app", "pages", "graph_viewer.py")
 AUDIO_VIEWER_MODULE_PATH = HERE.joinpath("agentverse-streamlit-app", "pages", "audio_viewer.py")
 
-CLIENT_SECRETS_FILE = HERE.joinpath("agentverse-streamlit-app", "client_secrets.json")
-
-SCOPES = [
-	"openid",
-	"https://www.googleapis.com/auth/userinfo.email",
-	"https://www.googleapis.com/auth/userinfo.profile",
-]
-
-
-def load_client_config():
-	# First, allow configuration via environment variables so secrets are not
-	# stored in the repository. Set these in your shell or use a secret manager:
-	#   GOOGLE_OAUTH_CLIENT_ID, GOOGLE_OAUTH_CLIENT_SECRET, GOOGLE_OAUTH_REDIRECT_URI
-	client_id = os.environ.get("GOOGLE_OAUTH_CLIENT_ID") or os.environ.get("CLIENT_ID")
-	client_secret = os.environ.get("GOOGLE_OAUTH_CLIENT_SECRET") or os.environ.get("CLIENT_SECRET")
-	redirect_uri = os.environ.get("GOOGLE_OAUTH_REDIRECT_URI") or "http://localhost:8501/"
-	if client_id and client_secret:
-		return {
-			"web": {
-				"client_id": client_id,
-				"client_secret": client_secret,
-				"redirect_uris": [redirect_uri],
-				"auth_uri": "https://accounts.google.com/o/oauth2/auth",
-				"token_uri": "https://oauth2.googleapis.com/token",
-			}
-		}
-
-	# # Fallback to reading the client_secrets.json file (for compatibility).
-
-	if CLIENT_SECRETS_FILE.exists():
+# Sends call the GenAI API in-process instead of spawning a fresh
+# interpreter for text_agent.py; get_client caches the shared client so
+# its connection pool survives reruns.
+sys.path.insert(0, str(HERE.joinpath("agentverse-streamlit-app")))
+from utils.genai_client import get_client as get_genai_client
+
+
+@st.cache_data(show_spinner=False)
+def extract_text(data: bytes, mime: str) -> str:
+	"""Extract text from an uploaded file's bytes, memoized on content.
+
+	Streamlit hashes the bytes for the cache key, so reruns with the same
+	file sitting in the uploader (or a re-upload of identical content)
+	skip the re-parse entirely.
+	"""
+	# The PDF/docx libraries are heavy imports; load them only when a file
+	# of that type is actually uploaded (sys.modules caches the module
+	# after the first upload).
+	if mime == "application/pdf":
 		try:
-			return json.loads(CLIENT_SECRETS_FILE.read_text(encoding="utf-8"))
-		except Exception:
-			return None
-	return None
-
-
-def login_flow():
-	client_config = load_client_config()
-	if not client_config:
-		st.error("Google client_secrets.json not found in frontend/agentverse-streamlit-app/. Please add it.")
-		return None
-
-	flow = Flow.from_client_config(client_config, scopes=SCOPES, redirect_uri="http://localhost:8501/")
-	auth_url, state = flow.authorization_url(prompt="consent", include_granted_scopes="true", access_type="offline")
-	try:
-		st.session_state["oauth_state"] = state
-	except Exception:
-		pass
-	return auth_url, state
-
-
-def exchange_code_for_user(code: str, state: str):
-	client_config = load_client_config()
-	flow = Flow.from_client_config(client_config, scopes=SCOPES, state=state, redirect_uri="http://localhost:8501/")
-	flow.fetch_token(code=code)
-	credentials = flow.credentials
-	# verify id token and extract user info
-	idinfo = id_token.verify_oauth2_token(credentials.id_token, grequests.Request(), client_config["web"]["client_id"])
-	return {"name": idinfo.get("name"), "email": idinfo.get("email")}
+			# pypdfium2 wraps PDFium (C++) and extracts text several times
+			# faster than pure-Python PyPDF2 on multi-page documents.
+			import pypdfium2 as pdfium
+		except ImportError:
+			pdfium = None
+		if pdfium is not None:
+			pdf = pdfium.PdfDocument(io.BytesIO(data))
+			try:
+				return "\n".join(
+					filter(None, (page.get_textpage().get_text_range() for page in pdf))
+				)
+			finally:
+				pdf.close()
+		from PyPDF2 import PdfReader
+		reader = PdfReader(io.BytesIO(data))
+		# Extract each page once; the old filter-in-comprehension form
+		# called page.extract_text() twice per page, doubling parse time.
+		parts = []
+		for page in reader.pages:
+			text = page.extract_text()
+			if text:
+				parts.append(text)
+		return "\n".join(parts)
+	elif mime == "text/plain":
+		return data.decode("utf-8")
+	elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+		from docx import Document
+		doc = Document(io.BytesIO(data))
+		return "\n".join(filter(None, (p.text for p in doc.paragraphs)))
+	else:
+		return ""
 
 
+# Viewer modules are loaded at most once per worker: without the cache,
+# every rerun while the user sits on the Graph/Audio page re-executed the
+# whole viewer module via spec_from_file_location + exec_module.
+@st.cache_resource
 def load_graph_viewer_module():
 	spec = importlib.util.spec_from_file_location("graph_viewer", str(GRAPH_VIEWER_PATH))
 	graph_viewer = importlib.util.module_from_spec(spec)
 	spec.loader.exec_module(graph_viewer)
 	return graph_viewer
 
+@st.cache_resource
 def load_audio_viewer_module():
 	spec = importlib.util.spec_from_file_location("audio_viewer", str(AUDIO_VIEWER_MODULE_PATH))
 	audio_viewer = importlib.util.module_from_spec(spec)
@@ -100,16 +91,6 @@ def load_audio_viewer_module():
 
 st.set_page_config(page_title="Agentverse", layout="wide")
 
-def _rerun_compat():
-	"""Try to programmatically rerun the Streamlit script in a version-compatible way."""
-	try:
-		st.rerun()
-	except AttributeError:
-		try:
-			st.experimental_rerun()
-		except Exception:
-			st.warning("Please refresh the page manually.")
-
 # Initialize active page in session state
 if "active_page" not in st.session_state:
 	st.session_state.active_page = "Chat"
@@ -120,11 +101,21 @@ params = st.query_params
 if "user" not in st.session_state:
 	st.session_state.user = None
 
+# Bounded history: the deque evicts the oldest exchanges automatically,
+# so per-rerun render cost stays flat however long the conversation runs.
+# Kept in session_state (not cache_resource) so each browser session has
+# its own chat rather than one store shared across every user.
+CHAT_HISTORY_MAX = 200
+CHAT_RENDER_WINDOW = 50
+
 if "messages" not in st.session_state:
-	st.session_state.messages = []
+	st.session_state.messages = collections.deque(maxlen=CHAT_HISTORY_MAX)
 
-# Comment out OAuth callback handling for testing if required 
-if "code" in params:
+# Comment out OAuth callback handling for testing if required
+# Once a user is logged in the callback code is stale; skipping the whole
+# block on reruns avoids re-touching query params and the token-exchange
+# path after every widget interaction.
+if st.session_state.user is None and "code" in params:
 	code = params["code"]
 	returned_state = params.get("state", "")
 	stored_state = st.session_state.get("oauth_state")
@@ -148,26 +139,30 @@ if "code" in params:
 			if "invalid_grant" in msg.lower() or "malformed" in msg.lower():
 				st.error("Login failed: received an invalid or malformed auth code.")
 				
-				with st.expander("Debug Information"):
-					try:
-						code_preview = (code[:8] + "...") if code else "(empty)"
-						st.info(f"Code preview: {code_preview} (length={len(code) if code else 0})")
-					except:
-						pass
-					
-					try:
-						client_cfg = load_client_config()
-						if client_cfg is None:
-							st.info("client_secrets.json missing or unreadable")
-						else:
-							st.info(f"client_secrets contains keys: {list(client_cfg.keys())}")
-							web = client_cfg.get("web") or client_cfg.get("installed")
-							if web:
-								st.info(f"client_id: {web.get('client_id')}")
-								uris = web.get('redirect_uris') or web.get('redirect_uri') or []
-								st.info(f"configured redirect_uris: {uris}")
-					except:
-						pass
+				with st.expander("Debug Information", expanded=False):
+					# Expander bodies execute at script time whether or not
+					# the user opens them; gate the config introspection so
+					# it only runs when explicitly requested.
+					if st.checkbox("Show debug details", key="_show_debug"):
+						try:
+							code_preview = (code[:8] + "...") if code else "(empty)"
+							st.info(f"Code preview: {code_preview} (length={len(code) if code else 0})")
+						except:
+							pass
+
+						try:
+							client_cfg = load_client_config()
+							if client_cfg is None:
+								st.info("client_secrets.json missing or unreadable")
+							else:
+								st.info(f"client_secrets contains keys: {list(client_cfg.keys())}")
+								web = client_cfg.get("web") or client_cfg.get("installed")
+								if web:
+									st.info(f"client_id: {web.get('client_id')}")
+									uris = web.get('redirect_uris') or web.get('redirect_uri') or []
+									st.info(f"configured redirect_uris: {uris}")
+						except:
+							pass
 				
 				st.markdown("""
 				**Try these steps:**
@@ -232,88 +227,55 @@ if not st.session_state.user:
 elif st.session_state.active_page == "Chat":
 	st.title("💬 Chat with Text Agent")
 	
+	def _render_message(m):
+		# Native chat components diff cheaply across reruns, unlike one
+		# unsafe_allow_html markdown blob per message.
+		with st.chat_message("user" if m.get("role") == "user" else "assistant"):
+			st.write(m.get("text"))
+
 	def render_messages():
-		for m in st.session_state.messages:
-			role = m.get("role")
-			text = m.get("text")
-			if role == "user":
-				st.markdown(f"""
-				<div style='display: flex; justify-content: flex-end; margin: 8px 0;'>
-					<div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-					color: white; padding: 12px 16px; border-radius: 18px; max-width: 70%; 
-					box-shadow: 0 2px 8px rgba(102, 126, 234, 0.3);'>
-					{text}
-					</div>
-				</div>
-				""", unsafe_allow_html=True)
-			else:
-				st.markdown(f"""
-				<div style='display: flex; justify-content: flex-start; margin: 8px 0;'>
-					<div style='background: #2d2d2d; color: white; padding: 12px 16px; 
-					border-radius: 18px; max-width: 70%; 
-					box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2);'>
-					{text}
-					</div>
-				</div>
-				""", unsafe_allow_html=True)
+		# Only the most recent window hits the page; older messages stay
+		# in the deque until evicted but cost nothing to rerun.
+		history = st.session_state.messages
+		start = max(len(history) - CHAT_RENDER_WINDOW, 0)
+		for m in itertools.islice(history, start, None):
+			_render_message(m)
 
 	render_messages()
 
-	user_input = st.text_input("Message", key="user_input")
-	if st.button("Send") and user_input:
-		st.session_state.messages.append({"role": "user", "text": user_input})
+	# A bare text_input reruns the whole script on every keystroke; inside
+	# a form the rerun is deferred until Send is pressed.
+	with st.form("chat_form", clear_on_submit=True):
+		user_input = st.text_input("Message")
+		submitted = st.form_submit_button("Send")
+	if submitted and user_input:
+		user_msg = {"role": "user", "text": user_input}
+		st.session_state.messages.append(user_msg)
+		_render_message(user_msg)
 
 		try:
-			result = subprocess.run(
-				[sys.executable, str(AGENTS_TEXT_AGENT), user_input], 
-				check=True,
-				capture_output=True,
-				text=True
-			)
-			if OUTPUT_JSON.exists():
-				data = json.loads(OUTPUT_JSON.read_text(encoding="utf-8"))
-				assistant_text = data.get("text_output", "")
-			else:
-				assistant_text = "(no response, text_agent did not produce output)"
-		except subprocess.CalledProcessError as exc:
-			assistant_text = f"Error running text agent:\n\nSTDOUT: {exc.stdout}\n\nSTDERR: {exc.stderr}"
+			# Stream tokens into the page as they arrive; write_stream returns
+			# the concatenated text for the history.
+			client = get_genai_client(os.environ["GENAI_API_KEY"])
+			chunks = client.generate_content_stream(user_input)
+			assistant_text = st.write_stream(c.text for c in chunks if c.text)
+		except KeyError:
+			assistant_text = "GENAI_API_KEY is not set; cannot reach the text agent."
+			st.error(assistant_text)
 		except Exception as exc:
-			# fallback to subprocess and capture output for diagnostics
-			try:
-				proc = subprocess.run([sys.executable, str(AGENTS_TEXT_AGENT), user_input], capture_output=True, text=True)
-				if proc.returncode == 0:
-					# try read json output first
-					if OUTPUT_JSON.exists():
-						data = json.loads(OUTPUT_JSON.read_text(encoding="utf-8"))
-						assistant_text = data.get("text_output", proc.stdout.strip())
-					else:
-						assistant_text = proc.stdout.strip() or proc.stderr.strip() or f"Subprocess exited with {proc.returncode}"
-				else:
-					assistant_text = f"Error running text agent (subprocess exit {proc.returncode}): {proc.stderr.strip() or proc.stdout.strip()}"
-			except Exception as exc2:
-				assistant_text = f"Error running text agent: {exc} ; fallback failed: {exc2}"
+			assistant_text = f"Error generating response: {exc}"
+			st.error(assistant_text)
 
 		st.session_state.messages.append({"role": "assistant", "text": assistant_text})
-		_rerun_compat()
+		# No forced rerun: the exchange is already on screen, and the next
+		# natural rerun renders it from session state.
 
 
 	uploaded_file = st.file_uploader("Upload a file", type=["pdf", "txt", "docx"])
 
-	def extract_text(file):
-		if file.type == "application/pdf":
-			reader = PdfReader(file)
-			return "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
-		elif file.type == "text/plain":
-			return file.read().decode("utf-8")
-		elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-			doc = Document(file)
-			return "\n".join(p.text for p in doc.paragraphs)
-		else:
-			return ""
-
 	if st.button("Send File") and uploaded_file:
 		with st.spinner("Extracting text..."):
-			raw_text = extract_text(uploaded_file)
+			raw_text = extract_text(uploaded_file.getvalue(), uploaded_file.type)
 			if raw_text:
 				st.subheader("📃 Extracted Text")
 				st.write(raw_text)
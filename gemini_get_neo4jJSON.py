@@ -2,9 +2,21 @@
 # pip install google-generativeai
 # Set env: export GEMINI_API_KEY="your_key_here"
 
-from google import genai  
+from google import genai
+import functools
 import os
 import json
+import re
+
+# Non-greedy fenced-block capture; compiled once at import.
+_JSON_BLOCK = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=4)
+def _client(api_key):
+    """One genai.Client per api_key; reuses its transport/connection pool
+    across calls instead of re-running auth and TLS setup each time."""
+    return genai.Client(api_key=api_key)
 
 #api_key = 
 # Instantiate client (the SDK will read env var x-goog-api-key if configured)
@@ -72,58 +84,67 @@ Alice
 # {transcript_text}
 # """
 
-def get_neo4j_json(api_key, notes_text, transcript_text):
-    # Use the text-generation / chat-style API. generate_content can accept a text prompt (or multimodal inputs).
-    client = genai.Client(api_key=api_key)
-    prompt = f"""
-    Summarize the following `notes_text` and `transcript_text` into a Neo4j-style JSON. 
-    First, understand the start of the transcript text to match person+ID to name.
-
-    Include:
-    - People (name, role, details, lastActivity)
-    - Project (name, description, lastWorkedOn)
-    - Issues (title, description, status)
-    - Relationships (WORKS_ON, MANAGES, ASSIGNED_TO, AFFECTS), using "from" and "to"
-    Return ONLY valid JSON.
-
-    Example detailing schema:
+# Static prompt body built once at import; only the two placeholders vary
+# per call, so each invocation is a single format() instead of
+# reconstructing the whole schema-bearing literal.
+_PROMPT_TMPL = """
+Summarize the following `notes_text` and `transcript_text` into a Neo4j-style JSON.
+First, understand the start of the transcript text to match person+ID to name.
+
+Include:
+- People (name, role, details, lastActivity)
+- Project (name, description, lastWorkedOn)
+- Issues (title, description, status)
+- Relationships (WORKS_ON, MANAGES, ASSIGNED_TO, AFFECTS), using "from" and "to"
+Return ONLY valid JSON.
+
+Example detailing schema:
+{{
+"nodes": [
     {{
-    "nodes": [
-        {{
-        "id": "person_alice",
-        "label": "Person",
-        "properties": {{
-            "name": "Alice",
-            "role": "Project Lead",
-            "details": "Ran quick sync; coordinated the fix activity.",
-            "lastActivity": "2025-11-01"
-        }}
-        }}
-    ],
-    "relationships": [
-        {{
-        "id": "r1",
-        "type": "WORKS_ON",
-        "from": "person_dana",
-        "to": "project_team_nebula",
-        "properties": {{}}
-        }}
-    ]
+    "id": "person_alice",
+    "label": "Person",
+    "properties": {{
+        "name": "Alice",
+        "role": "Project Lead",
+        "details": "Ran quick sync; coordinated the fix activity.",
+        "lastActivity": "2025-11-01"
+    }}
     }}
+],
+"relationships": [
+    {{
+    "id": "r1",
+    "type": "WORKS_ON",
+    "from": "person_dana",
+    "to": "project_team_nebula",
+    "properties": {{}}
+    }}
+]
+}}
+
+notes_text:
+{notes}
+
+transcript_text:
+{transcript}
+"""
 
-    notes_text:
-    {notes_text}
 
-    transcript_text:
-    {transcript_text}
-    """
+def get_neo4j_json(api_key, notes_text, transcript_text):
+    # Use the text-generation / chat-style API. generate_content can accept a text prompt (or multimodal inputs).
+    client = _client(api_key)
+    prompt = _PROMPT_TMPL.format(notes=notes_text, transcript=transcript_text)
     response = client.models.generate_content(
         model="gemini-2.5-flash",
         contents=prompt,
         config={"temperature": 0.0}
     )
-    text = str(response)
-    json_str = text.split("```json")[1].split("```")[0].strip()
+    # response.text is the lightweight accessor; str(response) serialized
+    # the whole response object (protos, metadata and all) just to split it.
+    raw = response.text
+    match = _JSON_BLOCK.search(raw)
+    json_str = match.group(1) if match else raw.strip()
     data = json.loads(json_str)
     return json.dumps(data, indent=2)
 
@@ -0,0 +1,59 @@
+"""Tests for TranscriptWatcher's notified (watchfiles) stream."""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("httpx")
+
+SPEECH_AGENT_PATH = (
+    Path(__file__).resolve().parent.parent / "agents" / "live_chating" / "speech_agent.py"
+)
+
+spec = importlib.util.spec_from_file_location("speech_agent", str(SPEECH_AGENT_PATH))
+speech_agent = importlib.util.module_from_spec(spec)
+# slots-dataclass creation looks the module up in sys.modules; register it
+# before executing or the import itself fails.
+sys.modules[spec.name] = speech_agent
+spec.loader.exec_module(speech_agent)
+
+
+def test_notified_stream_matches_relative_dataset_path(tmp_path, monkeypatch):
+    """A relative dataset path must still match watchfiles' absolute paths.
+
+    watchfiles yields absolute, canonicalized paths; the watcher's change
+    filter used to compare them against the raw (relative by default)
+    dataset path and silently dropped every event.
+    """
+    monkeypatch.chdir(tmp_path)
+    dataset = Path("frontend") / "transcripts_dataset.json"
+    dataset.parent.mkdir()
+    dataset.write_bytes(b"")
+
+    async def fake_awatch(_directory):
+        # Append after the initial drain, then report the change the way
+        # watchfiles does: as (Change, absolute_path) tuples.
+        entry = {"speaker": "spk_0", "transcript": "hello there"}
+        with open(dataset, "ab") as handle:
+            handle.write(json.dumps(entry).encode("utf-8") + b"\n")
+        yield {(None, os.path.abspath(dataset))}
+
+    monkeypatch.setattr(speech_agent, "awatch", fake_awatch)
+
+    watcher = speech_agent.TranscriptWatcher(dataset)
+
+    async def first_segment():
+        async for segment in watcher._stream_notified():
+            return segment
+        return None
+
+    segment = asyncio.run(first_segment())
+    assert segment is not None
+    assert segment.transcript == "hello there"
+    assert segment.speaker == "spk_0"